@@ -6,90 +6,111 @@ Usage:
     python audit-geo.py https://example.com
     python audit-geo.py https://example.com --output report.md
     python audit-geo.py https://example.com --mode technical
+    python audit-geo.py --urls-file urls.txt --output results.jsonl
+    cat urls.txt | python audit-geo.py --urls-file - --workers 8
 """
 
 import argparse
 import json
-import re
+import os
 import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from datetime import datetime
 from urllib.parse import urlparse
 
 try:
-    import requests
     from bs4 import BeautifulSoup
 except ImportError:
     import subprocess
     print("Installing required packages...", file=sys.stderr)
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "requests", "beautifulsoup4"])
-    import requests
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "beautifulsoup4"])
     from bs4 import BeautifulSoup
 
+from hedge_lexicon import get_lexicon, hedge_heatmap, hotspots
+from http_client import AI_CRAWLER_USER_AGENT, FetchError, configure, fetch
 
-# Hedge words for confidence analysis
-HEDGE_PATTERNS = [
-    r"\bmaybe\b",
-    r"\bpossibly\b",
-    r"\bperhaps\b",
-    r"\bmight\b",
-    r"\bcould be\b",
-    r"\bhowever\b",
-    r"\balthough\b",
-    r"\bit seems\b",
-    r"\barguably\b",
-    r"\bpotentially\b",
-    r"\bsome believe\b",
-    r"\bit appears\b",
-    r"\bin my opinion\b",
-    r"\bto some extent\b",
-]
+
+# AI crawlers abandon pages larger than this; fetches stop reading past it
+AI_CRAWLER_SIZE_LIMIT = 1024 * 1024
+
+# Sentences reported by --heatmap
+HOTSPOT_COUNT = 5
 
 
 class GeoAuditor:
     """GEO Auditor for AI search visibility analysis."""
 
-    def __init__(self, url: str, launch_year: int = None):
+    def __init__(self, url: str, launch_year: int = None, market: str = None,
+                 heatmap: bool = False):
         self.url = url
         self.domain = urlparse(url).netloc
         self.launch_year = launch_year
+        self.market = market
+        self.heatmap = heatmap
         self.raw_html = ""
         self.text_content = ""
         self.soup = None
+        self.html_size_bytes = None
+        self.html_truncated = False
+        self.transferred_bytes = None
 
     def fetch_content(self) -> bool:
         """Fetch URL content simulating an AI crawler."""
+        try:
+            response = self.fetch_page()
+        except FetchError as e:
+            print(f"Error fetching URL: {e}", file=sys.stderr)
+            return False
+
+        self.load_html(response.text, response.size, response.truncated, response.transferred)
+        return True
+
+    def fetch_page(self, timeout: float = None):
+        """Download the page as an AI crawler without parsing it (raises FetchError)."""
         headers = {
-            "User-Agent": "ClaudeBot/1.0 (compatible; AI-Search-Crawler)",
+            "User-Agent": AI_CRAWLER_USER_AGENT,
             "Accept": "text/html,application/xhtml+xml",
             "Accept-Language": "en-US,en;q=0.9",
         }
-
-        try:
-            response = requests.get(self.url, headers=headers, timeout=15)
-            response.raise_for_status()
-            self.raw_html = response.text
-            self.soup = BeautifulSoup(self.raw_html, "html.parser")
-
-            # Extract text content (remove scripts/styles)
-            for element in self.soup(["script", "style", "noscript"]):
-                element.extract()
-            self.text_content = self.soup.get_text(separator=" ", strip=True)
-
-            return True
-        except requests.RequestException as e:
-            print(f"Error fetching URL: {e}", file=sys.stderr)
-            return False
+        response = fetch(self.url, headers=headers, timeout=timeout, max_bytes=AI_CRAWLER_SIZE_LIMIT)
+        response.raise_for_status()
+        return response
+
+    def load_html(self, raw_html: str, size_bytes: int = None, truncated: bool = False,
+                  transferred: int = None):
+        """Parse already-fetched HTML, so callers can share one download.
+
+        `size_bytes` is the full page size when known; a `truncated` download
+        stopped at AI_CRAWLER_SIZE_LIMIT and may not know it.
+        """
+        self.raw_html = raw_html
+        self.html_truncated = truncated
+        self.transferred_bytes = transferred
+        if size_bytes is None and not truncated:
+            size_bytes = len(raw_html.encode("utf-8"))
+        self.html_size_bytes = size_bytes
+        self.soup = BeautifulSoup(self.raw_html, "html.parser")
+
+        # Extract text content (remove scripts/styles)
+        for element in self.soup(["script", "style", "noscript"]):
+            element.extract()
+        self.text_content = self.soup.get_text(separator=" ", strip=True)
 
     def audit_technical(self) -> dict:
         """Audit technical visibility factors."""
         results = {}
 
-        # HTML size check (1MB limit)
-        size_bytes = len(self.raw_html.encode("utf-8"))
+        # HTML size check (1MB limit); an aborted download is at least the limit
+        size_bytes = self.html_size_bytes
+        if size_bytes is None:
+            size_bytes = AI_CRAWLER_SIZE_LIMIT
         size_mb = size_bytes / (1024 * 1024)
         results["html_size_bytes"] = size_bytes
         results["html_size_mb"] = round(size_mb, 3)
-        results["size_risk"] = "HIGH" if size_mb > 1.0 else "LOW"
+        results["html_truncated"] = self.html_truncated
+        if self.transferred_bytes is not None:
+            results["transferred_bytes"] = self.transferred_bytes
+        results["size_risk"] = "HIGH" if self.html_truncated or size_mb > 1.0 else "LOW"
 
         # JS dependency check
         script_count = len(self.soup.find_all("script"))
@@ -126,17 +147,13 @@ class GeoAuditor:
 
     def audit_content(self) -> dict:
         """Audit content authority factors (hedge density)."""
-        words = self.text_content.split()
-        word_count = len(words)
-
-        hedge_count = 0
-        hedge_matches = []
+        text = self.text_content
+        lexicon = get_lexicon(self.market)
+        word_count = lexicon.count_words(text)
 
-        for pattern in HEDGE_PATTERNS:
-            matches = re.findall(pattern, self.text_content, re.IGNORECASE)
-            hedge_count += len(matches)
-            if matches:
-                hedge_matches.extend(matches)
+        hits = lexicon.scan(text)
+        hedge_count = len(hits)
+        hedge_matches = [text[start:end] for start, end, _ in hits]
 
         hedge_density = (hedge_count / word_count * 100) if word_count > 0 else 0
 
@@ -147,21 +164,24 @@ class GeoAuditor:
             "POOR"
         )
 
-        return {
+        results = {
             "word_count": word_count,
             "hedge_count": hedge_count,
             "hedge_density": round(hedge_density, 3),
             "confidence_rating": rating,
             "hedge_examples": list(set(hedge_matches))[:10],
         }
+        if self.heatmap:
+            results["hotspots"] = hotspots(text, hedge_heatmap(text, hits, lexicon), HOTSPOT_COUNT)
+        return results
 
     def check_agent_facts(self) -> dict:
         """Check for AgentFacts/NANDA protocol presence."""
         agent_facts_url = f"https://{self.domain}/.well-known/agent-facts"
 
         try:
-            response = requests.get(agent_facts_url, timeout=5)
-            if response.status_code == 200:
+            response = fetch(agent_facts_url)
+            if response.status == 200:
                 try:
                     schema = response.json()
                     has_context = "@context" in schema
@@ -174,7 +194,7 @@ class GeoAuditor:
                         "url": agent_facts_url,
                         "schema_preview": {k: v for k, v in list(schema.items())[:5]},
                     }
-                except json.JSONDecodeError:
+                except ValueError:
                     return {
                         "present": True,
                         "valid": False,
@@ -182,8 +202,8 @@ class GeoAuditor:
                         "url": agent_facts_url,
                     }
             else:
-                return {"present": False, "status_code": response.status_code}
-        except requests.RequestException:
+                return {"present": False, "status_code": response.status}
+        except FetchError:
             return {"present": False, "error": "Could not fetch"}
 
     def assess_discovery_strategy(self) -> dict:
@@ -251,6 +271,22 @@ class GeoAuditor:
                 ],
             }
 
+    def build_results(self, mode: str = "full", agent_facts: dict = None) -> dict:
+        """Collect the audit sections for `mode` into a JSON-ready dict."""
+        results = {
+            "url": self.url,
+            "timestamp": datetime.now().isoformat(),
+        }
+        if mode in ("full", "technical"):
+            results["technical"] = self.audit_technical()
+        if mode in ("full", "content"):
+            results["content"] = self.audit_content()
+        if mode in ("full", "agent"):
+            results["agent_facts"] = agent_facts if agent_facts is not None else self.check_agent_facts()
+        if mode == "full":
+            results["strategy"] = self.assess_discovery_strategy()
+        return results
+
     def generate_report(self, mode: str = "full") -> str:
         """Generate the audit report."""
         lines = [
@@ -269,6 +305,10 @@ class GeoAuditor:
                 "",
                 f"HTML Size: {tech['html_size_mb']} MB ({tech['html_size_bytes']:,} bytes)",
                 f"Size Risk: {tech['size_risk']} (limit: 1.0 MB)",
+            ])
+            if tech["html_truncated"]:
+                lines.append("Download stopped at the 1.0 MB limit; content checks cover the first 1.0 MB")
+            lines.extend([
                 "",
                 f"Script Tags: {tech['script_count']}",
                 f"Raw Text Length: {tech['text_length']:,} chars",
@@ -294,6 +334,11 @@ class GeoAuditor:
             if content['hedge_examples']:
                 lines.append(f"Examples: {', '.join(content['hedge_examples'])}")
                 lines.append("")
+            if content.get('hotspots'):
+                lines.append("Most Hedged Sentences:")
+                for spot in content['hotspots']:
+                    lines.append(f"- ({spot['hedges']} hedges, {spot['density']}%) {spot['text']}")
+                lines.append("")
 
         if mode in ("full", "agent"):
             agent = self.check_agent_facts()
@@ -346,11 +391,121 @@ class GeoAuditor:
         return "\n".join(lines)
 
 
+def read_urls(path: str):
+    """Yield URLs from a file (or stdin for "-"), skipping blanks and # comments."""
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def fetch_for_batch(url: str, mode: str) -> dict:
+    """I/O stage of a batch audit: download the page and agent-facts (runs in a thread)."""
+    auditor = GeoAuditor(url)
+    try:
+        response = auditor.fetch_page()
+    except FetchError as e:
+        return {"url": url, "error": str(e)}
+    return {
+        "url": url,
+        "raw_html": response.text,
+        "size_bytes": response.size,
+        "truncated": response.truncated,
+        "transferred": response.transferred,
+        "agent_facts": auditor.check_agent_facts() if mode in ("full", "agent") else None,
+    }
+
+
+def analyze_for_batch(page: dict, mode: str, launch_year: int = None, market: str = None,
+                      heatmap: bool = False) -> dict:
+    """CPU stage of a batch audit: parse and analyze one page (runs in a worker process)."""
+    auditor = GeoAuditor(page["url"], launch_year, market, heatmap)
+    auditor.load_html(page["raw_html"], page["size_bytes"], page["truncated"], page["transferred"])
+    return auditor.build_results(mode, agent_facts=page["agent_facts"])
+
+
+def audit_batch(urls, out, mode: str = "full", launch_year: int = None,
+                workers: int = None, fetch_concurrency: int = 16, market: str = None,
+                heatmap: bool = False) -> tuple:
+    """Audit many URLs, writing one JSON line per result as soon as it is ready.
+
+    Fetches overlap on a thread pool while parsing and analysis run on a
+    process pool. At most a small window of pages is held in memory at once.
+    Returns (succeeded, failed) counts.
+    """
+    workers = workers or os.cpu_count() or 1
+    window = fetch_concurrency + workers * 2
+    urls = iter(urls)
+    succeeded = failed = 0
+
+    def write(record: dict):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    with ThreadPoolExecutor(max_workers=fetch_concurrency) as fetchers, \
+            ProcessPoolExecutor(max_workers=workers) as parsers:
+        fetching, parsing = {}, {}
+        exhausted = False
+        while True:
+            while not exhausted and len(fetching) + len(parsing) < window:
+                url = next(urls, None)
+                if url is None:
+                    exhausted = True
+                    break
+                fetching[fetchers.submit(fetch_for_batch, url, mode)] = url
+            if not fetching and not parsing:
+                break
+
+            done, _ = wait(fetching.keys() | parsing.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetching:
+                    url = fetching.pop(future)
+                    try:
+                        page = future.result()
+                    except Exception as e:
+                        page = {"url": url, "error": f"Fetch failed: {e}"}
+                    if "error" in page:
+                        failed += 1
+                        write(page)
+                    else:
+                        future = parsers.submit(analyze_for_batch, page, mode, launch_year, market, heatmap)
+                        parsing[future] = page["url"]
+                else:
+                    url = parsing.pop(future)
+                    try:
+                        write(future.result())
+                        succeeded += 1
+                    except Exception as e:
+                        failed += 1
+                        write({"url": url, "error": f"Analysis failed: {e}"})
+    return succeeded, failed
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="GEO Audit - Generative Engine Optimization analysis"
     )
-    parser.add_argument("url", help="URL to audit")
+    parser.add_argument("url", nargs="?", help="URL to audit")
+    parser.add_argument(
+        "--urls-file",
+        help="Audit every URL in this file (one per line, - for stdin) and write JSONL"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Batch mode: parser processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--fetch-concurrency",
+        type=int,
+        default=16,
+        help="Batch mode: concurrent page downloads (default: 16)"
+    )
     parser.add_argument(
         "--output", "-o",
         help="Output file (default: stdout)"
@@ -366,34 +521,54 @@ def main():
         type=int,
         help="Year the site launched (for strategy recommendations)"
     )
+    parser.add_argument(
+        "--market",
+        help="Market or language whose hedge lexicon is added to English (e.g. JP, DE, FR)"
+    )
+    parser.add_argument(
+        "--heatmap",
+        action="store_true",
+        help="Report the most hedged sentences in the content audit"
+    )
     parser.add_argument(
         "--json",
         action="store_true",
         help="Output as JSON instead of text"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the on-disk HTTP cache and refetch everything"
+    )
 
     args = parser.parse_args()
 
-    auditor = GeoAuditor(args.url, args.launch_year)
+    if args.no_cache:
+        configure(cache=False)
+
+    if args.urls_file:
+        out = open(args.output, "w") if args.output else sys.stdout
+        try:
+            succeeded, failed = audit_batch(
+                read_urls(args.urls_file), out, args.mode, args.launch_year,
+                args.workers, args.fetch_concurrency, args.market, args.heatmap,
+            )
+        finally:
+            if args.output:
+                out.close()
+        print(f"Audited {succeeded} URLs ({failed} failed)", file=sys.stderr)
+        sys.exit(1 if failed and not succeeded else 0)
+
+    if not args.url:
+        parser.error("a URL or --urls-file is required")
+
+    auditor = GeoAuditor(args.url, args.launch_year, args.market, args.heatmap)
 
     if not auditor.fetch_content():
         sys.exit(1)
 
     if args.json:
-        results = {
-            "url": args.url,
-            "timestamp": datetime.now().isoformat(),
-        }
-        if args.mode in ("full", "technical"):
-            results["technical"] = auditor.audit_technical()
-        if args.mode in ("full", "content"):
-            results["content"] = auditor.audit_content()
-        if args.mode in ("full", "agent"):
-            results["agent_facts"] = auditor.check_agent_facts()
-        if args.mode == "full":
-            results["strategy"] = auditor.assess_discovery_strategy()
-
-        output = json.dumps(results, indent=2)
+        output = json.dumps(auditor.build_results(args.mode), indent=2)
     else:
         output = auditor.generate_report(args.mode)
 
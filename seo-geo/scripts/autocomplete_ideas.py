@@ -4,9 +4,11 @@ Google Autocomplete keyword suggestions using DataForSEO API
 Get real-time search suggestions from Google Autocomplete
 
 Usage: python3 scripts/autocomplete_ideas.py "Claude Code"
+       python3 scripts/autocomplete_ideas.py "Claude Code" --save research.kwc
 """
 import argparse
-from dataforseo_api import api_post, get_result
+from dataforseo_api import api_post, get_result, run_cli
+from keyword_store import keyword_row, save_keywords
 
 
 def main():
@@ -14,6 +16,8 @@ def main():
     parser.add_argument("keyword", help="Seed keyword for autocomplete")
     parser.add_argument("--location", "-loc", type=int, default=2840,
                         help="Location code (default: 2840 = US)")
+    parser.add_argument("--save", metavar="FILE",
+                        help="Add the suggestions to a keyword_store dataset (.kwc, no volumes)")
     args = parser.parse_args()
 
     data = [{
@@ -58,6 +62,11 @@ def main():
             print(f"autocomplete_suggestions[{len(suggestions)}]:")
             for i, suggestion in enumerate(suggestions, 1):
                 print(f"  {i}. {suggestion}")
+            if args.save:
+                save_keywords(args.save, [keyword_row(suggestion, location=args.location,
+                                                      source=f"autocomplete:{args.keyword}")
+                                          for suggestion in suggestions])
+                print(f"saved: {len(suggestions)} suggestions to {args.save}")
         else:
             print("No suggestions found")
     else:
@@ -71,4 +80,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
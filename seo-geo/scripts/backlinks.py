@@ -2,17 +2,27 @@
 """
 Backlinks analysis using DataForSEO API
 Usage: python3 scripts/backlinks.py "example.com" --limit 20
+       python3 scripts/backlinks.py "example.com" --export backlinks.jsonl
 """
 import argparse
-from dataforseo_api import api_post, get_result, print_backlinks_list, format_count
+from dataforseo_api import api_post, get_result, print_backlinks_list, format_count, run_cli
+from dataforseo_export import export
 
 
 def main():
     parser = argparse.ArgumentParser(description="Backlinks analysis")
     parser.add_argument("target", help="Target domain")
     parser.add_argument("--limit", "-l", type=int, default=20, help="Max results")
+    parser.add_argument("--export", metavar="FILE",
+                        help="Stream every backlink to a .jsonl/.csv file (resumable)")
     args = parser.parse_args()
 
+    if args.export:
+        summary = export("backlinks", args.target, args.export)
+        print(f"target: {args.target}")
+        print(f"exported: {summary['rows']} backlinks to {args.export}")
+        return
+
     data = [{
         "target": args.target,
         "limit": args.limit,
@@ -34,4 +44,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
@@ -6,77 +6,58 @@ Usage:
     python check-hedge-density.py --url https://example.com/blog/post
     python check-hedge-density.py --text "Your content to analyze"
     python check-hedge-density.py --file content.txt
+    python check-hedge-density.py --corpus docs/ --threshold 0.2
+    python check-hedge-density.py --urls-file urls.txt --json
+    cat export.txt | python check-hedge-density.py --file -
 """
 
 import argparse
+import glob
+import hashlib
+import json
+import os
+import random
 import re
 import sys
+import time
 
-# Optional imports for URL fetching
-requests = None
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from hedge_lexicon import get_lexicon, hedge_heatmap, hotspots
+from http_client import configure, fetch
+
+STREAM_CHUNK_SIZE = 1 << 20
+STREAM_THRESHOLD = 64 << 20  # --file inputs larger than this are streamed
+CONTEXT_CHARS = 30
+CORPUS_EXTENSIONS = (".txt", ".md", ".markdown", ".rst", ".html", ".htm")
+HTML_EXTENSIONS = (".html", ".htm")
+HOTSPOTS_PER_DOCUMENT = 3
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+# Optional import for URL fetching
 BeautifulSoup = None
 
 try:
-    import requests as _requests
     from bs4 import BeautifulSoup as _BeautifulSoup
-    requests = _requests
     BeautifulSoup = _BeautifulSoup
 except ImportError:
     pass  # Will auto-install if URL mode is used
 
 
-# Hedge patterns with categories
-HEDGE_PATTERNS = {
-    "uncertainty": [
-        (r"\bmaybe\b", "maybe"),
-        (r"\bpossibly\b", "possibly"),
-        (r"\bperhaps\b", "perhaps"),
-        (r"\bmight\b", "might"),
-        (r"\bcould be\b", "could be"),
-        (r"\bpotentially\b", "potentially"),
-    ],
-    "contrast": [
-        (r"\bhowever\b", "however"),
-        (r"\balthough\b", "although"),
-        (r"\bnevertheless\b", "nevertheless"),
-        (r"\bnonetheless\b", "nonetheless"),
-    ],
-    "perception": [
-        (r"\bit seems\b", "it seems"),
-        (r"\bit appears\b", "it appears"),
-        (r"\barguably\b", "arguably"),
-        (r"\bapparently\b", "apparently"),
-    ],
-    "opinion": [
-        (r"\bin my opinion\b", "in my opinion"),
-        (r"\bsome believe\b", "some believe"),
-        (r"\bto some extent\b", "to some extent"),
-        (r"\bi think\b", "I think"),
-        (r"\bi believe\b", "I believe"),
-    ],
-}
-
-
-def fetch_text_from_url(url: str) -> str:
-    """Fetch and extract text from a URL."""
-    global requests, BeautifulSoup
-    if requests is None or BeautifulSoup is None:
+def ensure_bs4():
+    """Import BeautifulSoup, installing it on first use."""
+    global BeautifulSoup
+    if BeautifulSoup is None:
         import subprocess
         print("Installing required packages...", file=sys.stderr)
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "requests", "beautifulsoup4"])
-        import requests as _requests
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "beautifulsoup4"])
         from bs4 import BeautifulSoup as _BeautifulSoup
-        requests = _requests
         BeautifulSoup = _BeautifulSoup
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (compatible; HedgeAnalyzer/1.0)",
-    }
-
-    response = requests.get(url, headers=headers, timeout=15)
-    response.raise_for_status()
 
-    soup = BeautifulSoup(response.text, "html.parser")
+def html_to_text(html: str) -> str:
+    """Extract the main readable text from an HTML document."""
+    ensure_bs4()
+    soup = BeautifulSoup(html, "html.parser")
 
     # Remove scripts, styles, nav, footer
     for element in soup(["script", "style", "noscript", "nav", "footer", "header"]):
@@ -90,76 +71,448 @@ def fetch_text_from_url(url: str) -> str:
     return soup.get_text(separator=" ", strip=True)
 
 
-def analyze_hedge_density(text: str, verbose: bool = False) -> dict:
-    """Analyze hedge density in text."""
-    words = text.split()
-    word_count = len(words)
+def fetch_text_from_url(url: str) -> str:
+    """Fetch and extract text from a URL."""
+    response = fetch(url)
+    response.raise_for_status()
+    return html_to_text(response.text)
+
+
+def rate_density(hedge_density: float) -> tuple:
+    """Map a hedge density (percent) to (rating, recommendation)."""
+    if hedge_density < 0.1:
+        return "EXCELLENT", "Content has strong confidence signals. Maintain current tone."
+    if hedge_density < 0.2:
+        return "GOOD", "Minor improvements possible. Review flagged hedges."
+    if hedge_density < 0.5:
+        return "FAIR", "Significant hedging detected. Review and reduce uncertainty language."
+    return "POOR", "High hedge density hurts AI citation probability. Major rewrite recommended."
+
 
+def build_results(text: str, word_count: int, hits: list, verbose: bool = False,
+                  market: str = None, heatmap: bool = False) -> dict:
+    """Turn Lexicon.scan() hits (in text order) into the analysis result dict."""
     if word_count == 0:
         return {
             "word_count": 0,
             "error": "No text to analyze",
         }
 
-    # Find all hedges with positions
+    lexicon = get_lexicon(market)
+    entries = lexicon.entries
+    sentence_map = hedge_heatmap(text, hits, lexicon) if heatmap else None
+
+    # Report findings grouped by pattern, as the per-pattern scan did
+    hits = sorted(hits, key=lambda hit: hit[2])
+    total_hedge_count = len(hits)
+
+    # Context is only built for the findings that are reported
     hedge_findings = []
-    total_hedge_count = 0
-
-    for category, patterns in HEDGE_PATTERNS.items():
-        for pattern, name in patterns:
-            matches = list(re.finditer(pattern, text, re.IGNORECASE))
-            for match in matches:
-                # Find surrounding context
-                start = max(0, match.start() - 30)
-                end = min(len(text), match.end() + 30)
-                context = text[start:end].strip()
-                if start > 0:
-                    context = "..." + context
-                if end < len(text):
-                    context = context + "..."
-
-                hedge_findings.append({
-                    "word": name,
-                    "category": category,
-                    "position": match.start(),
-                    "context": context,
-                })
-                total_hedge_count += 1
+    for match_start, match_end, order in hits if verbose else hits[:10]:
+        name, category, _ = entries[order]
+        # Find surrounding context
+        start = max(0, match_start - 30)
+        end = min(len(text), match_end + 30)
+        context = text[start:end].strip()
+        if start > 0:
+            context = "..." + context
+        if end < len(text):
+            context = context + "..."
+
+        hedge_findings.append({
+            "word": name,
+            "category": category,
+            "position": match_start,
+            "context": context,
+        })
 
     # Calculate density
     hedge_density = (total_hedge_count / word_count) * 100
+    rating, recommendation = rate_density(hedge_density)
 
-    # Determine rating
-    if hedge_density < 0.1:
-        rating = "EXCELLENT"
-        recommendation = "Content has strong confidence signals. Maintain current tone."
-    elif hedge_density < 0.2:
-        rating = "GOOD"
-        recommendation = "Minor improvements possible. Review flagged hedges."
-    elif hedge_density < 0.5:
-        rating = "FAIR"
-        recommendation = "Significant hedging detected. Review and reduce uncertainty language."
+    # Group by category
+    by_category = {}
+    for _, _, order in hits:
+        category = entries[order][1]
+        by_category[category] = by_category.get(category, 0) + 1
+
+    results = {
+        "word_count": word_count,
+        "hedge_count": total_hedge_count,
+        "hedge_density": round(hedge_density, 3),
+        "rating": rating,
+        "recommendation": recommendation,
+        "by_category": by_category,
+        "findings": hedge_findings,
+        "truncated": total_hedge_count > 10 and not verbose,
+    }
+    if sentence_map is not None:
+        results["heatmap"] = sentence_map
+    return results
+
+
+def analyze_hedge_density(text: str, verbose: bool = False, market: str = None,
+                          heatmap: bool = False) -> dict:
+    """Analyze hedge density in text, optionally with a per-sentence heatmap."""
+    lexicon = get_lexicon(market)
+    word_count = lexicon.count_words(text)
+    if word_count == 0:
+        return build_results(text, 0, [], verbose, market)
+    return build_results(text, word_count, lexicon.scan(text), verbose, market, heatmap)
+
+
+def paragraph_spans(text: str):
+    """Yield (start, end) of each blank-line separated paragraph."""
+    start = 0
+    for separator in PARAGRAPH_BREAK.finditer(text):
+        if separator.start() > start:
+            yield start, separator.start()
+        start = separator.end()
+    if start < len(text):
+        yield start, len(text)
+
+
+class IncrementalAnalyzer:
+    """Re-analyzes edited text, rescanning only paragraphs whose content changed.
+
+    Per-paragraph word counts and hedge hits are memoized by content hash.
+    Paragraph breaks are whitespace, so no word or hedge phrase can straddle
+    one and the combined result equals a full analyze_hedge_density() run.
+    """
+
+    def __init__(self, market: str = None):
+        self.market = market
+        self.lexicon = get_lexicon(market)
+        self.memo = {}
+        self.rescanned = 0
+        self.reused = 0
+
+    def analyze(self, text: str, verbose: bool = False, heatmap: bool = False) -> dict:
+        memo = {}
+        word_count = 0
+        hits = []
+        self.rescanned = self.reused = 0
+        for start, end in paragraph_spans(text):
+            paragraph = text[start:end]
+            data = paragraph.encode("utf-8", "surrogatepass")
+            key = hashlib.blake2b(data, digest_size=16).hexdigest()
+            entry = memo.get(key) or self.memo.get(key)
+            if entry is None:
+                entry = (self.lexicon.count_words(paragraph), self.lexicon.scan(paragraph))
+                self.rescanned += 1
+            else:
+                self.reused += 1
+            # Only paragraphs of the current text are kept, bounding the memo
+            memo[key] = entry
+            word_count += entry[0]
+            hits.extend((start + hit_start, start + hit_end, order) for hit_start, hit_end, order in entry[1])
+        self.memo = memo
+        return build_results(text, word_count, hits, verbose, self.market, heatmap)
+
+    def load(self, path: str):
+        """Load a memo saved by save(); ignored if missing or built from another lexicon."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("lexicon") != self.lexicon.fingerprint:
+            return
+        self.memo = {
+            key: (words, [tuple(hit) for hit in hits])
+            for key, (words, hits) in data.get("paragraphs", {}).items()
+        }
+
+    def save(self, path: str):
+        """Persist the memo so the next run only rescans changed paragraphs."""
+        with open(path, "w") as f:
+            json.dump({"lexicon": self.lexicon.fingerprint, "paragraphs": self.memo}, f)
+
+
+def read_chunks(path: str, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Yield text chunks from a file, or from stdin when path is "-"."""
+    if path == "-":
+        yield from iter(lambda: sys.stdin.read(chunk_size), "")
+        return
+    with open(path, "r") as f:
+        yield from iter(lambda: f.read(chunk_size), "")
+
+
+def analyze_hedge_stream(chunks, samples: int = 10, seed: int = 0, market: str = None) -> dict:
+    """Analyze hedge density over an iterable of text chunks in constant memory.
+
+    Words and hedges that straddle chunk boundaries are counted exactly once.
+    Only counters and a reservoir of `samples` example findings are kept, so
+    the findings are a uniform sample rather than the first matches.
+    """
+    lexicon = get_lexicon(market)
+    # A match starting this far before the buffer end is final: the phrase,
+    # its trailing word boundary and its trailing context are all buffered
+    margin = lexicon.longest + CONTEXT_CHARS + 1
+    rng = random.Random(seed)
+
+    word_count = 0
+    hedge_count = 0
+    by_category = {}
+    reservoir = []
+    buf = ""
+    base = 0      # absolute offset of buf[0]
+    scan = 0      # buf offset where the next hedge may start
+    counted = 0   # buf offset up to which words have been counted
+
+    def consume(limit: int, final: bool):
+        nonlocal word_count, hedge_count, scan, counted
+        # A word running across `counted` was already counted in the last segment
+        segment = buf[counted:limit]
+        words = lexicon.count_words(segment)
+        if (words and counted and lexicon.is_word_char(segment[0])
+                and lexicon.is_word_char(buf[counted - 1])):
+            words -= 1
+        word_count += words
+        counted = limit
+
+        lowered = buf.lower()
+        if len(lowered) == len(buf):
+            matches = lexicon.regex.finditer(lowered, scan)
+        else:
+            matches = lexicon.ignorecase_regex.finditer(buf, scan)
+        for match in matches:
+            if match.start() >= limit:
+                break
+            scan = match.end()
+            name, category, _ = lexicon.entry(match.group())
+            hedge_count += 1
+            by_category[category] = by_category.get(category, 0) + 1
+
+            # Reservoir sampling keeps a uniform sample of fixed size
+            slot = len(reservoir) if len(reservoir) < samples else rng.randrange(hedge_count)
+            if slot >= samples:
+                continue
+            start = max(0, match.start() - CONTEXT_CHARS)
+            end = min(len(buf), match.end() + CONTEXT_CHARS)
+            context = buf[start:end].strip()
+            if base + start > 0:
+                context = "..." + context
+            if not final or end < len(buf):
+                context = context + "..."
+            finding = {
+                "word": name,
+                "category": category,
+                "position": base + match.start(),
+                "context": context,
+            }
+            if slot == len(reservoir):
+                reservoir.append(finding)
+            else:
+                reservoir[slot] = finding
+        scan = max(scan, limit)
+
+    for chunk in chunks:
+        buf += chunk
+        limit = len(buf) - margin
+        if limit <= scan:
+            continue
+        consume(limit, final=False)
+        # Keep enough history for leading context and the \b lookbehind
+        drop = max(0, min(scan, counted) - CONTEXT_CHARS - 1)
+        buf = buf[drop:]
+        base += drop
+        scan -= drop
+        counted -= drop
+    consume(len(buf), final=True)
+
+    if word_count == 0:
+        return {
+            "word_count": 0,
+            "error": "No text to analyze",
+        }
+
+    hedge_density = (hedge_count / word_count) * 100
+    rating, recommendation = rate_density(hedge_density)
+
+    return {
+        "word_count": word_count,
+        "hedge_count": hedge_count,
+        "hedge_density": round(hedge_density, 3),
+        "rating": rating,
+        "recommendation": recommendation,
+        "by_category": {cat: by_category[cat] for cat in lexicon.categories if cat in by_category},
+        "findings": sorted(reservoir, key=lambda finding: finding["position"]),
+        "truncated": hedge_count > len(reservoir),
+        "sampled": True,
+    }
+
+
+def corpus_sources(spec: str):
+    """Yield document paths from a directory (recursive) or a glob pattern."""
+    if os.path.isdir(spec):
+        for root, dirs, files in os.walk(spec):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(CORPUS_EXTENSIONS):
+                    yield os.path.join(root, name)
     else:
-        rating = "POOR"
-        recommendation = "High hedge density hurts AI citation probability. Major rewrite recommended."
+        for path in sorted(glob.iglob(spec, recursive=True)):
+            if os.path.isfile(path):
+                yield path
+
+
+def read_urls(path: str):
+    """Yield URLs from a file (or stdin for "-"), skipping blanks and # comments."""
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def fetch_html(url: str) -> str:
+    """I/O stage of a corpus run: download one page (runs in a thread)."""
+    response = fetch(url)
+    response.raise_for_status()
+    return response.text
+
+
+def analyze_document(source: str, html: str = None, market: str = None,
+                     heatmap: bool = False) -> dict:
+    """CPU stage of a corpus run: analyze one document (runs in a worker process).
+
+    HTML (fetched, or a .html/.htm file) is reduced to its main text first;
+    other files are streamed so large documents stay in constant memory,
+    unless a heatmap is requested, which needs the whole text.
+    """
+    text = None
+    if html is None and (heatmap or source.lower().endswith(HTML_EXTENSIONS)):
+        with open(source, "r") as f:
+            html = f.read()
+        if not source.lower().endswith(HTML_EXTENSIONS):
+            text = html
+    if html is not None:
+        text = text if text is not None else html_to_text(html)
+        results = analyze_hedge_density(text, market=market, heatmap=heatmap)
+    else:
+        results = analyze_hedge_stream(read_chunks(source), samples=0, market=market)
+    if "error" in results:
+        return {"source": source, "error": results["error"]}
+    document = {
+        "source": source,
+        "word_count": results["word_count"],
+        "hedge_count": results["hedge_count"],
+        "hedge_density": results["hedge_density"],
+        "by_category": results["by_category"],
+    }
+    if heatmap:
+        document["hotspots"] = hotspots(text, results["heatmap"], HOTSPOTS_PER_DOCUMENT)
+    return document
+
+
+def analyze_corpus(sources, workers: int = None, fetch_concurrency: int = 16,
+                   market: str = None, heatmap: bool = False) -> list:
+    """Analyze many files and URLs, returning one result dict per document.
+
+    URLs are downloaded on a thread pool while analysis runs on a process
+    pool; only a small window of documents is in flight at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    window = fetch_concurrency + workers * 2
+    sources = iter(sources)
+    documents = []
+
+    with ThreadPoolExecutor(max_workers=fetch_concurrency) as fetchers, \
+            ProcessPoolExecutor(max_workers=workers) as analyzers:
+        fetching, analyzing = {}, {}
+        exhausted = False
+        while True:
+            while not exhausted and len(fetching) + len(analyzing) < window:
+                source = next(sources, None)
+                if source is None:
+                    exhausted = True
+                    break
+                if source.startswith(("http://", "https://")):
+                    fetching[fetchers.submit(fetch_html, source)] = source
+                else:
+                    analyzing[analyzers.submit(analyze_document, source, None, market, heatmap)] = source
+            if not fetching and not analyzing:
+                break
+
+            done, _ = wait(fetching.keys() | analyzing.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetching:
+                    source = fetching.pop(future)
+                    try:
+                        html = future.result()
+                    except Exception as e:
+                        documents.append({"source": source, "error": str(e)})
+                        continue
+                    analyzing[analyzers.submit(analyze_document, source, html, market, heatmap)] = source
+                else:
+                    source = analyzing.pop(future)
+                    try:
+                        documents.append(future.result())
+                    except Exception as e:
+                        documents.append({"source": source, "error": f"Analysis failed: {e}"})
+    return documents
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def summarize_corpus(documents: list, top: int = 10, market: str = None) -> dict:
+    """Aggregate per-document results into corpus-level statistics.
+
+    hedge_density is the corpus-wide rate (all hedges over all words), which
+    is what --threshold gates on.
+    """
+    analyzed = [doc for doc in documents if "error" not in doc]
+    failed = [doc for doc in documents if "error" in doc]
+    word_count = sum(doc["word_count"] for doc in analyzed)
+    hedge_count = sum(doc["hedge_count"] for doc in analyzed)
+    densities = sorted(doc["hedge_count"] / doc["word_count"] * 100 for doc in analyzed)
 
-    # Group by category
     by_category = {}
-    for finding in hedge_findings:
-        cat = finding["category"]
-        if cat not in by_category:
-            by_category[cat] = []
-        by_category[cat].append(finding)
+    for doc in analyzed:
+        for category, count in doc["by_category"].items():
+            by_category[category] = by_category.get(category, 0) + count
+
+    if not word_count:
+        return {
+            "documents": len(analyzed),
+            "failed": len(failed),
+            "word_count": 0,
+            "error": "No text to analyze",
+            "errors": failed,
+        }
+
+    hedge_density = hedge_count / word_count * 100
+    rating, recommendation = rate_density(hedge_density)
+    worst = sorted(analyzed, key=lambda doc: (-doc["hedge_density"], doc["source"]))[:top]
 
     return {
+        "documents": len(analyzed),
+        "failed": len(failed),
         "word_count": word_count,
-        "hedge_count": total_hedge_count,
+        "hedge_count": hedge_count,
         "hedge_density": round(hedge_density, 3),
         "rating": rating,
         "recommendation": recommendation,
-        "by_category": {k: len(v) for k, v in by_category.items()},
-        "findings": hedge_findings if verbose else hedge_findings[:10],
-        "truncated": len(hedge_findings) > 10 and not verbose,
+        "density_mean": round(sum(densities) / len(densities), 3),
+        "density_p50": round(percentile(densities, 50), 3),
+        "density_p90": round(percentile(densities, 90), 3),
+        "density_p99": round(percentile(densities, 99), 3),
+        "by_category": {cat: by_category[cat] for cat in get_lexicon(market).categories
+                        if cat in by_category},
+        "worst": worst,
+        "results": sorted(analyzed, key=lambda doc: doc["source"]),
+        "errors": failed,
     }
 
 
@@ -185,18 +538,118 @@ def print_report(results: dict, show_context: bool = True):
             print(f"  - {category}: {count}")
 
     if results["findings"]:
-        print("\nHedges Found:")
+        print("\nSample of Hedges Found:" if results.get("sampled") else "\nHedges Found:")
         for i, finding in enumerate(results["findings"], 1):
             print(f"\n  {i}. \"{finding['word']}\" ({finding['category']})")
             if show_context:
                 print(f"     Context: {finding['context']}")
 
     if results.get("truncated"):
-        print(f"\n  ... and {results['hedge_count'] - 10} more (use --verbose to see all)")
+        if results.get("sampled"):
+            print(f"\n  ... {len(results['findings'])} sampled of {results['hedge_count']} (use --samples to keep more)")
+        else:
+            print(f"\n  ... and {results['hedge_count'] - 10} more (use --verbose to see all)")
+
+    print("\n" + "=" * 60)
+
+
+def print_heatmap(text: str, heatmap: dict, market: str = None):
+    """Print the text sentence by sentence with a heat gutter and [bracketed] hedges."""
+    lexicon = get_lexicon(market)
+    print("\n" + "=" * 60)
+    print("HEDGE HEATMAP (per sentence)")
+    print("=" * 60)
+
+    paragraph = None
+    for entry in heatmap["sentences"]:
+        if entry["paragraph"] != paragraph:
+            paragraph = entry["paragraph"]
+            print(f"\n[Paragraph {paragraph + 1}]")
+        sentence = text[entry["start"]:entry["end"]]
+        pieces = []
+        last = 0
+        if entry["hedges"]:
+            for start, end, _ in lexicon.scan(sentence):
+                pieces.append(sentence[last:start])
+                pieces.append(f"[{sentence[start:end]}]")
+                last = end
+        pieces.append(sentence[last:])
+        annotated = " ".join("".join(pieces).split())
+        bar = "#" * min(entry["hedges"], 5)
+        print(f"  {bar:<5} {entry['density']:>5}% | {annotated}")
+
+    print("\n" + "=" * 60)
+
+
+def print_corpus_report(summary: dict):
+    """Print formatted corpus analysis report."""
+    print("\n" + "=" * 60)
+    print("HEDGE DENSITY CORPUS ANALYSIS")
+    print("=" * 60)
+
+    print(f"\nDocuments: {summary['documents']:,} analyzed, {summary['failed']:,} failed")
+    if "error" in summary:
+        print(f"\nError: {summary['error']}")
+    else:
+        print(f"Word Count: {summary['word_count']:,}")
+        print(f"Hedge Words Found: {summary['hedge_count']:,}")
+        print(f"Corpus Hedge Density: {summary['hedge_density']}%")
+        print(f"Per-Document Density: mean {summary['density_mean']}%, "
+              f"p50 {summary['density_p50']}%, p90 {summary['density_p90']}%, "
+              f"p99 {summary['density_p99']}%")
+        print(f"Rating: {summary['rating']}")
+        print(f"\nRecommendation: {summary['recommendation']}")
+
+        if summary["by_category"]:
+            print("\nBreakdown by Category:")
+            for category, count in sorted(summary["by_category"].items(), key=lambda x: -x[1]):
+                print(f"  - {category}: {count:,}")
+
+        if summary["worst"]:
+            print("\nWorst Offenders:")
+            for i, doc in enumerate(summary["worst"], 1):
+                print(f"  {i}. {doc['source']} - {doc['hedge_density']}% "
+                      f"({doc['hedge_count']} in {doc['word_count']:,} words)")
+                for spot in doc.get("hotspots", []):
+                    print(f"       {spot['hedges']} hedges: {spot['text']}")
+
+    if summary["errors"]:
+        print("\nFailed:")
+        for doc in summary["errors"]:
+            print(f"  - {doc['source']}: {doc['error']}")
 
     print("\n" + "=" * 60)
 
 
+def watch_file(path: str, analyzer: IncrementalAnalyzer, emit, verbose: bool = False,
+               interval: float = 0.5, heatmap: bool = False) -> dict:
+    """Re-analyze path each time it changes until interrupted; returns the last results."""
+    last_state = None
+    results = {}
+    try:
+        while True:
+            try:
+                stat = os.stat(path)
+                state = (stat.st_mtime_ns, stat.st_size)
+                if state != last_state:
+                    with open(path, "r") as f:
+                        text = f.read()
+            except OSError:
+                state = None  # Editors may briefly remove the file while saving; retry next poll
+            if state is not None and state != last_state:
+                last_state = state
+                started = time.perf_counter()
+                results = analyzer.analyze(text, verbose, heatmap)
+                elapsed = (time.perf_counter() - started) * 1000
+                emit(results, text)
+                print(f"Rescanned {analyzer.rescanned} of {analyzer.rescanned + analyzer.reused} "
+                      f"paragraphs in {elapsed:.1f} ms", file=sys.stderr)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Analyze hedge density in content for AI visibility"
@@ -205,7 +658,9 @@ def main():
     input_group = parser.add_mutually_exclusive_group(required=True)
     input_group.add_argument("--url", "-u", help="URL to analyze")
     input_group.add_argument("--text", "-t", help="Text to analyze directly")
-    input_group.add_argument("--file", "-f", help="File to analyze")
+    input_group.add_argument("--file", "-f", help="File to analyze (- for stdin)")
+    input_group.add_argument("--corpus", help="Directory or glob of documents to analyze as a corpus")
+    input_group.add_argument("--urls-file", help="File with one URL per line to analyze as a corpus (- for stdin)")
 
     parser.add_argument(
         "--verbose", "-v",
@@ -226,34 +681,153 @@ def main():
         "--threshold",
         type=float,
         default=0.2,
-        help="Exit with code 1 if density exceeds threshold (default: 0.2)"
+        help="Exit with code 1 if density (corpus-wide in corpus mode) exceeds threshold (default: 0.2); "
+             "corpus mode also exits 1 if any document fails"
+    )
+    parser.add_argument(
+        "--market",
+        help="Market or language whose hedge lexicon is added to English (e.g. JP, DE, FR)"
+    )
+    parser.add_argument(
+        "--heatmap",
+        action="store_true",
+        help="Add a per-sentence hedge heatmap (annotated text, or \"heatmap\" in --json); "
+             "in corpus mode, list each document's hottest sentences"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream --file in chunks with constant memory (automatic for stdin and files over 64 MB)"
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=10,
+        help="Example findings kept in streaming mode (default: 10)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Re-analyze --file whenever it changes, rescanning only edited paragraphs"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="Watch mode: seconds between change checks (default: 0.5)"
+    )
+    parser.add_argument(
+        "--memo",
+        help="Persist per-paragraph results here so later runs only rescan changed paragraphs"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Corpus mode: analysis processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--fetch-concurrency",
+        type=int,
+        default=16,
+        help="Corpus mode: concurrent URL downloads (default: 16)"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Corpus mode: worst offenders to list (default: 10)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore the on-disk HTTP cache when fetching --url"
     )
 
     args = parser.parse_args()
 
-    # Get text to analyze
+    if args.watch and (not args.file or args.file == "-"):
+        parser.error("--watch requires --file with a path")
+
+    if args.no_cache:
+        configure(cache=False)
+
+    if args.corpus or args.urls_file:
+        if args.corpus:
+            sources = list(corpus_sources(args.corpus))
+            needs_html = any(path.lower().endswith(HTML_EXTENSIONS) for path in sources)
+        else:
+            sources = read_urls(args.urls_file)
+            needs_html = True
+        if needs_html:
+            ensure_bs4()
+        try:
+            documents = analyze_corpus(sources, args.workers, args.fetch_concurrency, args.market,
+                                       args.heatmap)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        summary = summarize_corpus(documents, top=args.top, market=args.market)
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print_corpus_report(summary)
+        # A gate that couldn't read every document (or found no text) must not pass
+        if summary["failed"] or "error" in summary or summary["hedge_density"] > args.threshold:
+            sys.exit(1)
+        return
+
+    def emit(results: dict, text: str = None):
+        if args.json:
+            print(json.dumps(results, indent=None if args.watch else 2), flush=True)
+        else:
+            print_report(results, show_context=not args.no_context)
+            if "heatmap" in results and text is not None:
+                print_heatmap(text, results["heatmap"], args.market)
+
+    analyzer = None
+    if args.memo or args.watch:
+        analyzer = IncrementalAnalyzer(args.market)
+        if args.memo:
+            analyzer.load(args.memo)
+
+    def analyze(text: str) -> dict:
+        if analyzer:
+            return analyzer.analyze(text, verbose=args.verbose, heatmap=args.heatmap)
+        return analyze_hedge_density(text, verbose=args.verbose, market=args.market,
+                                     heatmap=args.heatmap)
+
+    # Get text to analyze and analyze it
+    text = None
     try:
-        if args.url:
+        if args.watch:
+            results = watch_file(args.file, analyzer, emit, args.verbose, args.interval,
+                                 args.heatmap)
+        elif args.url:
             print(f"Fetching: {args.url}")
             text = fetch_text_from_url(args.url)
+            results = analyze(text)
+        elif args.file and (args.stream or args.file == "-"
+                            or os.path.getsize(args.file) > STREAM_THRESHOLD):
+            if args.heatmap:
+                print("Note: --heatmap is not available in streaming mode", file=sys.stderr)
+            results = analyze_hedge_stream(read_chunks(args.file), samples=args.samples,
+                                           market=args.market)
         elif args.file:
             with open(args.file, "r") as f:
                 text = f.read()
+            results = analyze(text)
         else:
             text = args.text
+            results = analyze(text)
+        if args.memo:
+            analyzer.save(args.memo)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
-    # Analyze
-    results = analyze_hedge_density(text, verbose=args.verbose)
-
-    # Output
-    if args.json:
-        import json
-        print(json.dumps(results, indent=2))
-    else:
-        print_report(results, show_context=not args.no_context)
+    # Output (watch mode has already printed every run)
+    if not args.watch:
+        emit(results, text)
 
     # Exit code based on threshold
     if results.get("hedge_density", 0) > args.threshold:
@@ -3,25 +3,109 @@
 Competitor keyword gap analysis using DataForSEO API
 Finds keywords where competitor ranks but you don't
 
+With several competitors (or --local) each domain's ranked keywords are
+pulled once into the local keyword_sets store and compared in-process.
+
 Usage: python3 scripts/competitor_gap.py "opc.dev" "claudemarketplaces.com" --limit 50
+       python3 scripts/competitor_gap.py "opc.dev" "a.com" "b.com" "c.com" --min-competitors 2
 """
 import argparse
-from dataforseo_api import api_post, get_result, format_count
+import sys
+from dataforseo_api import api_post, get_result, format_count, run_cli
+from dataforseo_export import pluck
+from keyword_sets import MAX_KEYWORDS, GapEngine, load_sets
+from keyword_store import keyword_row, save_keywords
+
+KEYWORD_VOLUME = ("keyword_data", "keyword_info", "search_volume")
+KEYWORD_CPC = ("keyword_data", "keyword_info", "cpc")
+KEYWORD_DIFFICULTY = ("keyword_data", "keyword_properties", "keyword_difficulty")
+
+
+def save_gaps(path: str, rows: list):
+    save_keywords(path, rows)
+    print(f"\nsaved: {len(rows)} keywords to {path}")
+
+
+def local_gap(args):
+    """N-way gap, overlap and unique analysis over locally stored keyword sets"""
+    domains = list(dict.fromkeys([args.my_domain] + args.competitor_domain))
+
+    def fetched(keyword_set):
+        # One write per line; sets are fetched from several threads
+        sys.stderr.write(f"fetched: {keyword_set.domain} ({format_count(len(keyword_set))} keywords)\n")
+
+    universe, sets = load_sets(domains, args.location, max_keywords=args.max_keywords,
+                               refresh=args.refresh, concurrency=args.concurrency, progress=fetched)
+    engine = GapEngine(universe, sets)
+    overlap = engine.overlap_matrix()
+    unique = engine.unique()
+    total, gaps = engine.gaps(args.my_domain, domains[1:], args.min_competitors, args.limit)
+
+    print(f"my_domain: {args.my_domain}")
+    print(f"competitors: {','.join(domains[1:])}")
+    print(f"location: {args.location}")
+    print()
+    print(f"domains[{len(domains)}]{{domain,keywords,overlap_with_me,gap_vs_me,unique_keywords,unique_volume}}:")
+    for d, domain in enumerate(domains):
+        print(f"  {domain},{format_count(overlap[d][d])},{format_count(overlap[0][d])},"
+              f"{format_count(overlap[d][d] - overlap[0][d])},{format_count(unique[d]['keywords'])},"
+              f"{format_count(unique[d]['volume'])}")
+
+    if args.matrix:
+        print()
+        print(f"overlap_matrix[{len(domains)}]{{domain,{','.join(domains)}}}:")
+        for d, domain in enumerate(domains):
+            print(f"  {domain},{','.join(str(count) for count in overlap[d])}")
+
+    print()
+    if not gaps:
+        print("No keyword gaps found")
+        return
+    print(f"keyword_gaps[{len(gaps)} of {total}]"
+          f"{{keyword,volume,difficulty,competitors,best_position,best_competitor}}:")
+    for gap in gaps:
+        difficulty = "N/A" if gap["difficulty"] is None else gap["difficulty"]
+        position = "N/A" if gap["best_position"] is None else gap["best_position"]
+        print(f"  {gap['keyword']},{format_count(gap['volume'])},{difficulty},{gap['competitors']},"
+              f"{position},{gap['best_competitor']}")
+    if args.save:
+        save_gaps(args.save, [keyword_row(gap["keyword"], gap["volume"], gap["difficulty"], None,
+                                          args.location, f"competitor_gap:{args.my_domain}")
+                              for gap in gaps])
 
 
 def main():
     parser = argparse.ArgumentParser(description="Competitor keyword gap analysis")
     parser.add_argument("my_domain", help="Your domain (without https://)")
-    parser.add_argument("competitor_domain", help="Competitor domain (without https://)")
+    parser.add_argument("competitor_domain", nargs="+", help="Competitor domain(s) (without https://)")
     parser.add_argument("--location", "-loc", type=int, default=2840,
                         help="Location code (default: 2840 = US)")
     parser.add_argument("--limit", "-l", type=int, default=50, 
                         help="Max results (default: 50)")
+    parser.add_argument("--local", action="store_true",
+                        help="Compare locally stored keyword sets (default with several competitors)")
+    parser.add_argument("--min-competitors", type=int, default=1,
+                        help="Local mode: only gaps at least this many competitors rank for (default: 1)")
+    parser.add_argument("--matrix", action="store_true", help="Local mode: print the full overlap matrix")
+    parser.add_argument("--max-keywords", type=int, default=MAX_KEYWORDS,
+                        help=f"Local mode: ranked keywords stored per domain (default: {MAX_KEYWORDS})")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Local mode: refetch keyword sets even if stored ones are fresh")
+    parser.add_argument("--concurrency", "-c", type=int, default=4,
+                        help="Local mode: domains fetched in parallel (default: 4)")
+    parser.add_argument("--save", metavar="FILE", help="Add the gaps to a keyword_store dataset (.kwc)")
     args = parser.parse_args()
 
+    if args.min_competitors < 1:
+        parser.error("--min-competitors must be at least 1")
+    if args.local or len(args.competitor_domain) > 1:
+        local_gap(args)
+        return
+
+    competitor_domain = args.competitor_domain[0]
     data = [{
         "target1": args.my_domain,
-        "target2": args.competitor_domain,
+        "target2": competitor_domain,
         "location_code": args.location,
         "language_code": "en",
         "intersections": False,  # Only show keywords where target2 ranks but target1 doesn't
@@ -32,7 +116,7 @@ def main():
     results = get_result(response)
     
     print(f"my_domain: {args.my_domain}")
-    print(f"competitor_domain: {args.competitor_domain}")
+    print(f"competitor_domain: {competitor_domain}")
     print(f"location: {args.location}")
     print()
     
@@ -69,6 +153,13 @@ def main():
                 comp_pos = "N/A"
             
             print(f"  {keyword},{volume},{difficulty},{comp_pos}")
+
+        if args.save:
+            save_gaps(args.save, [
+                keyword_row(item["keyword_data"]["keyword"], pluck(item, KEYWORD_VOLUME),
+                            pluck(item, KEYWORD_DIFFICULTY), pluck(item, KEYWORD_CPC), args.location,
+                            f"competitor_gap:{args.my_domain}")
+                for item in all_items if pluck(item, ("keyword_data", "keyword"))])
     else:
         print("No keyword gaps found")
     
@@ -77,4 +168,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
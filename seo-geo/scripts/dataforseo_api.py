@@ -4,47 +4,373 @@ DataForSEO API wrapper
 """
 import urllib.request
 import urllib.parse
+import urllib.error
 import json
 import base64
+import os
+import random
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from credential import get_dataforseo_credentials
+from dataforseo_cache import get_cache
 
 API_BASE = "https://api.dataforseo.com/v3"
 
+# task_post endpoints accept up to 100 tasks per request; live endpoints one
+MAX_TASKS_PER_POST = 100
+LIVE_TASKS_PER_POST = 1
+OK_STATUS = 20000
+CREATED_STATUS = 20100
 
-def api_post(endpoint: str, data: list) -> dict:
-    """Make POST request to DataForSEO API"""
-    login, password = get_dataforseo_credentials()
-    if not login or not password:
-        print("error: DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD not set", file=sys.stderr)
-        print("Run: export DATAFORSEO_LOGIN=your_login", file=sys.stderr)
-        print("     export DATAFORSEO_PASSWORD=your_password", file=sys.stderr)
-        sys.exit(1)
-    
-    url = f"{API_BASE}/{endpoint}"
-    auth = base64.b64encode(f"{login}:{password}".encode()).decode()
-    headers = {
-        "Authorization": f"Basic {auth}",
-        "Content-Type": "application/json"
-    }
-    
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(data).encode(),
-        headers=headers,
-        method="POST"
-    )
-    
+# DataForSEO allows 2000 API calls per minute per account
+RATE_PER_MINUTE = int(os.environ.get("SEO_GEO_DATAFORSEO_RPM", "2000"))
+MAX_RETRIES = int(os.environ.get("SEO_GEO_DATAFORSEO_RETRIES", "5"))
+TIMEOUT = 60
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+# Top-level status codes DataForSEO answers with HTTP 200
+RATE_LIMIT_STATUS = 40202
+SERVER_ERROR_STATUS = 50000
+
+
+class DataForSEOError(Exception):
+    """Raised when a request to the DataForSEO API fails"""
+
+    retryable = False
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CredentialsError(DataForSEOError):
+    """DATAFORSEO_LOGIN / DATAFORSEO_PASSWORD missing or rejected"""
+
+
+class RequestError(DataForSEOError):
+    """The API rejected the request itself (bad endpoint or payload)"""
+
+
+class RateLimitError(DataForSEOError):
+    """Too many requests; DataForSEO did not process the request"""
+
+    retryable = True
+
+    def __init__(self, message: str, status: int = None, retry_after: float = None):
+        super().__init__(message, status)
+        self.retry_after = retry_after
+
+
+class ServerError(DataForSEOError):
+    """5xx response or internal API error"""
+
+    retryable = True
+
+
+class TransportError(DataForSEOError):
+    """Connection failure, timeout or unreadable response"""
+
+    retryable = True
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate_per_minute requests with bursts up to capacity"""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity or max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns the seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the token even if it goes negative, so waiters queue up in order
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class DataForSEOClient:
+    """DataForSEO client with a shared rate limiter and retries with jittered backoff.
+
+    GET and live requests only read data, so every retryable failure is
+    retried. task_post creates billed tasks, so it is only retried when the
+    API rejected it for rate limiting. Errors surface as DataForSEOError
+    subclasses.
+    """
+
+    def __init__(self, login: str = None, password: str = None, rate_per_minute: float = None,
+                 max_retries: int = None, timeout: float = None):
+        if not login or not password:
+            login, password = get_dataforseo_credentials()
+        if not login or not password:
+            raise CredentialsError("DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD not set")
+        self.auth = base64.b64encode(f"{login}:{password}".encode()).decode()
+        self.rate_per_minute = rate_per_minute or RATE_PER_MINUTE
+        self.max_retries = MAX_RETRIES if max_retries is None else max_retries
+        self.timeout = timeout or TIMEOUT
+        self.limiter = TokenBucket(self.rate_per_minute)
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "retries": 0, "throttled": 0, "rate_limited": 0, "throttle_wait": 0.0}
+
+    def post(self, endpoint: str, data: list) -> dict:
+        return self.request("POST", endpoint, data)
+
+    def get(self, endpoint: str) -> dict:
+        return self.request("GET", endpoint)
+
+    def request(self, method: str, endpoint: str, data: list = None) -> dict:
+        """Send one request, retrying retryable failures with exponential backoff"""
+        idempotent = method == "GET" or "/task_post" not in endpoint
+        for attempt in range(self.max_retries + 1):
+            waited = self.limiter.acquire()
+            self._count(requests=1, throttled=1 if waited else 0, throttle_wait=waited)
+            try:
+                return self._send(method, endpoint, data)
+            except DataForSEOError as e:
+                if isinstance(e, RateLimitError):
+                    self._count(rate_limited=1)
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                if not idempotent and not isinstance(e, RateLimitError):
+                    raise
+                self._count(retries=1)
+                time.sleep(self.backoff(attempt, getattr(e, "retry_after", None)))
+
+    @staticmethod
+    def backoff(attempt: int, retry_after: float = None) -> float:
+        """Full-jitter exponential delay, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    def _send(self, method: str, endpoint: str, data: list = None) -> dict:
+        req = urllib.request.Request(
+            f"{API_BASE}/{endpoint}",
+            data=json.dumps(data).encode() if data is not None else None,
+            headers={
+                "Authorization": f"Basic {self.auth}",
+                "Content-Type": "application/json"
+            },
+            method=method
+        )
+
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                body = resp.read()
+        except urllib.error.HTTPError as e:
+            raise _http_error(e) from e
+        except (urllib.error.URLError, OSError) as e:
+            raise TransportError(str(getattr(e, "reason", e))) from e
+
+        try:
+            response = json.loads(body.decode())
+        except ValueError as e:
+            raise TransportError(f"Unreadable response: {e}") from e
+
+        status = response.get("status_code")
+        message = response.get("status_message") or "Unknown error"
+        if status == RATE_LIMIT_STATUS:
+            raise RateLimitError(message, status)
+        if status and status >= SERVER_ERROR_STATUS:
+            raise ServerError(message, status)
+        return response
+
+    def _count(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counts[name] += amount
+
+    def stats(self) -> dict:
+        """Requests sent, retries, local throttle waits and server rate-limit responses"""
+        with self._lock:
+            return {**self.counts, "throttle_wait": round(self.counts["throttle_wait"], 2)}
+
+
+def _http_error(e: urllib.error.HTTPError) -> DataForSEOError:
+    """Map an HTTP error response to the matching exception type"""
+    try:
+        body = e.read().decode(errors="replace")
+    except OSError:
+        body = ""
+    message = f"HTTP {e.code} - {body}" if body else f"HTTP {e.code}"
+    if e.code in (401, 403):
+        return CredentialsError(message, e.code)
+    if e.code == 429:
+        retry_after = e.headers.get("Retry-After") if e.headers else None
+        try:
+            retry_after = float(retry_after) if retry_after else None
+        except ValueError:
+            retry_after = None  # An HTTP date; fall back to backoff
+        return RateLimitError(message, e.code, retry_after)
+    if e.code >= 500:
+        return ServerError(message, e.code)
+    return RequestError(message, e.code)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> DataForSEOClient:
+    """Return the process-wide client, so every thread shares one rate limiter"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DataForSEOClient()
+        return _client
+
+
+def configure(rate_per_minute: float = None, max_retries: int = None,
+              timeout: float = None) -> DataForSEOClient:
+    """Replace the shared client with one using the given settings"""
+    global _client
+    with _client_lock:
+        old = _client
+        _client = DataForSEOClient(
+            rate_per_minute=rate_per_minute or (old.rate_per_minute if old else None),
+            max_retries=max_retries if max_retries is not None else (old.max_retries if old else None),
+            timeout=timeout or (old.timeout if old else None),
+        )
+        return _client
+
+
+def run_cli(main):
+    """Run a script's main(), reporting DataForSEO errors and retry counts on stderr"""
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            return json.loads(resp.read().decode())
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode()
-        print(f"error: HTTP {e.code} - {error_body}", file=sys.stderr)
+        main()
+    except CredentialsError as e:
+        print(f"error: {e}", file=sys.stderr)
+        if e.status is None:
+            print("Run: export DATAFORSEO_LOGIN=your_login", file=sys.stderr)
+            print("     export DATAFORSEO_PASSWORD=your_password", file=sys.stderr)
         sys.exit(1)
-    except Exception as e:
+    except DataForSEOError as e:
         print(f"error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        stats = _client.stats() if _client else None
+        if stats and (stats["retries"] or stats["throttled"] or stats["rate_limited"]):
+            print(f"dataforseo: requests {stats['requests']}, retries {stats['retries']}, "
+                  f"throttled {stats['throttled']} ({stats['throttle_wait']}s), "
+                  f"rate_limited {stats['rate_limited']}", file=sys.stderr)
+
+
+def api_post(endpoint: str, data: list) -> dict:
+    """Make POST request to DataForSEO API.
+
+    Raises DataForSEOError (CredentialsError, RateLimitError, ...) on failure;
+    scripts run their main() through run_cli() to turn that into an exit code.
+    """
+    return cached_post(endpoint, data)
+
+
+def cached_post(endpoint: str, data: list) -> dict:
+    """post_json() through the response cache for live endpoints.
+
+    Each task is looked up separately; only the uncached ones are posted and
+    only successful tasks are stored. A fully cached request is answered
+    without touching the network and carries "from_cache": True.
+    """
+    cache = get_cache() if "/live" in endpoint else None
+    if cache is None:
+        return post_json(endpoint, data)
+
+    keys = [cache.key(endpoint, task) for task in data]
+    tasks = [cache.get(key) for key in keys]
+    missing = [i for i, task in enumerate(tasks) if task is None]
+    if not missing:
+        return {"status_code": OK_STATUS, "status_message": "Ok.", "tasks": tasks, "from_cache": True}
+
+    response = post_json(endpoint, [data[i] for i in missing])
+    returned = response.get("tasks") or []
+    if not returned:
+        return response
+    for j, i in enumerate(missing):
+        task = returned[j] if j < len(returned) else _failed_task(data[i], "No task returned")
+        if task.get("status_code") == OK_STATUS:
+            cache.put(keys[i], endpoint, task)
+        tasks[i] = task
+    return {**response, "tasks": tasks}
+
+
+def post_json(endpoint: str, data: list) -> dict:
+    """POST a task list to DataForSEO through the shared client and return the decoded response"""
+    return get_client().post(endpoint, data)
+
+
+def get_json(endpoint: str) -> dict:
+    """GET a DataForSEO endpoint (tasks_ready, task_get/...) and return the decoded response"""
+    return get_client().get(endpoint)
+
+
+def tasks_per_post(endpoint: str) -> int:
+    """How many tasks DataForSEO accepts in one POST to this endpoint"""
+    return LIVE_TASKS_PER_POST if "/live" in endpoint else MAX_TASKS_PER_POST
+
+
+def _failed_task(data: dict, message: str, status_code: int = None) -> dict:
+    """A task object standing in for one that never came back"""
+    return {"status_code": status_code, "status_message": message, "data": data, "result": None}
+
+
+def api_post_batch(endpoint: str, tasks: list, max_tasks: int = None, concurrency: int = 4) -> list:
+    """POST many tasks in as few requests as the endpoint allows.
+
+    Tasks are packed up to max_tasks per request (default: tasks_per_post)
+    and requests run concurrently. Returns one DataForSEO task object per
+    input task, in input order; errors stay on their task (status_code and
+    status_message) instead of aborting the batch.
+    """
+    max_tasks = max_tasks or tasks_per_post(endpoint)
+    chunks = [(i, tasks[i:i + max_tasks]) for i in range(0, len(tasks), max_tasks)]
+    results = [None] * len(tasks)
+
+    def send(chunk: list) -> tuple:
+        try:
+            return cached_post(endpoint, chunk), None
+        except CredentialsError:
+            raise  # Every other chunk would fail the same way
+        except DataForSEOError as e:
+            return None, str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        responses = executor.map(send, [chunk for _, chunk in chunks])
+        for (offset, chunk), (response, error) in zip(chunks, responses):
+            returned = (response or {}).get("tasks") or []
+            if response and not returned and response.get("status_code") != OK_STATUS:
+                error = response.get("status_message", "Unknown error")
+            # DataForSEO returns tasks[i] for the i-th task posted
+            for i, data in enumerate(chunk):
+                if error:
+                    results[offset + i] = _failed_task(data, error)
+                elif i < len(returned):
+                    results[offset + i] = returned[i]
+                else:
+                    results[offset + i] = _failed_task(data, "No task returned")
+    return results
+
+
+def task_result(task: dict) -> list:
+    """Result list of one task object, or [] if the task failed"""
+    if not task or task.get("status_code") != OK_STATUS:
+        return []
+    return task.get("result") or []
+
+
+def task_error(task: dict) -> str:
+    """Error message of a failed task object, or None if it succeeded"""
+    if task and task.get("status_code") == OK_STATUS:
+        return None
+    return (task or {}).get("status_message") or "Unknown error"
 
 
 def format_count(n) -> str:
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Persistent SQLite cache for DataForSEO live responses
+
+Successful tasks are stored per endpoint and canonical payload hash, so a
+repeated keyword, SERP or backlinks query is answered locally instead of
+being billed again. TTLs are set per endpoint family. The database runs in
+WAL mode so concurrent scripts can share it. It is capped in size with
+least-recently-used eviction, and hit/miss counters are kept in the file.
+Lookups only read: access times and counters are buffered and written in
+one transaction every few hundred lookups, with the next store, and at
+exit. Tasks served from the cache carry "from_cache": True and a cost of 0,
+since nothing was billed for them.
+
+Settings (environment):
+    SEO_GEO_DATAFORSEO_CACHE        database path (default: ~/.cache/seo-geo/dataforseo.sqlite3)
+    SEO_GEO_DATAFORSEO_CACHE_MB     size cap in MB (default: 512)
+    SEO_GEO_NO_CACHE=1              disable caching (shared with http_client)
+
+Usage: python3 scripts/dataforseo_cache.py --stats
+"""
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+CACHE_PATH = os.environ.get(
+    "SEO_GEO_DATAFORSEO_CACHE",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                 "seo-geo", "dataforseo.sqlite3"),
+)
+CACHE_MAX_BYTES = int(float(os.environ.get("SEO_GEO_DATAFORSEO_CACHE_MB", "512")) * 1024 * 1024)
+CACHE_ENABLED = os.environ.get("SEO_GEO_NO_CACHE", "") in ("", "0")
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Endpoint prefix -> TTL in seconds; the first matching prefix wins
+ENDPOINT_TTLS = [
+    ("serp/google/autocomplete/", 6 * HOUR),
+    ("serp/", DAY),
+    ("keywords_data/", 7 * DAY),
+    ("dataforseo_labs/", 3 * DAY),
+    ("backlinks/", 7 * DAY),
+]
+DEFAULT_TTL = DAY
+# Buffered access-time and counter updates are written after this many
+# lookups or seconds, whichever comes first
+FLUSH_EVERY = 256
+FLUSH_SECONDS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    expires REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def ttl_for(endpoint: str) -> int:
+    """Cache lifetime in seconds for an endpoint"""
+    for prefix, ttl in ENDPOINT_TTLS:
+        if endpoint.startswith(prefix):
+            return ttl
+    return DEFAULT_TTL
+
+
+class ApiCache:
+    """SQLite store of successful DataForSEO task objects"""
+
+    def __init__(self, path: str = None, max_bytes: int = None):
+        self.path = path or CACHE_PATH
+        self.max_bytes = max_bytes or CACHE_MAX_BYTES
+        # Counters for this process; the database keeps running totals
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last access time, not yet written
+        self._counts = {"hits": 0, "misses": 0}
+        self._flushed = time.monotonic()
+        atexit.register(self.flush)
+
+    def _db(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers and a writer overlap across processes"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            self._local.db = db
+        return db
+
+    @staticmethod
+    def key(endpoint: str, task: dict) -> str:
+        """Cache key: endpoint plus the hash of the canonicalized task payload"""
+        canonical = json.dumps(task, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{endpoint}\n{canonical}".encode()).hexdigest()
+
+    def _count(self, db: sqlite3.Connection, name: str, amount: int = 1):
+        db.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get(self, key: str) -> dict:
+        """Return the cached task object (cost 0, from_cache True), or None if missing or expired"""
+        db = self._db()
+        now = time.time()
+        row = db.execute("SELECT expires, body FROM responses WHERE key = ?", (key,)).fetchone()
+        hit = row is not None and row[0] > now
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self._counts["hits"] += 1
+                self._touched[key] = now
+            else:
+                self.misses += 1
+                self._counts["misses"] += 1
+            due = (sum(self._counts.values()) >= FLUSH_EVERY
+                   or time.monotonic() - self._flushed >= FLUSH_SECONDS)
+        if due:
+            self.flush()
+        if not hit:
+            return None
+        task = json.loads(zlib.decompress(row[1]))
+        task["cost"] = 0
+        task["from_cache"] = True
+        return task
+
+    def _take_pending(self) -> tuple:
+        with self._lock:
+            touched, counts = self._touched, self._counts
+            self._touched, self._counts = {}, {"hits": 0, "misses": 0}
+            self._flushed = time.monotonic()
+        return touched, counts
+
+    def _write_pending(self, db: sqlite3.Connection, touched: dict, counts: dict):
+        db.executemany("UPDATE responses SET accessed = MAX(accessed, ?) WHERE key = ?",
+                       [(accessed, key) for key, accessed in touched.items()])
+        for name, amount in counts.items():
+            if amount:
+                self._count(db, name, amount)
+
+    def flush(self):
+        """Write buffered access times and hit/miss counters in one transaction"""
+        touched, counts = self._take_pending()
+        if not touched and not any(counts.values()):
+            return
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_pending(db, touched, counts)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def put(self, key: str, endpoint: str, task: dict):
+        """Store a successful task object, evicting old entries past the size cap"""
+        body = zlib.compress(json.dumps(task, separators=(",", ":")).encode())
+        now = time.time()
+        touched, counts = self._take_pending()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # Recent reads count before eviction picks least recently used entries
+            self._write_pending(db, touched, counts)
+            old = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, expires, accessed, size, body) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, now + ttl_for(endpoint), now, len(body), body),
+            )
+            self._count(db, "bytes", len(body) - (old[0] if old else 0))
+            self._count(db, "stores")
+            self._evict(db, now)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        """Drop expired entries, then least recently used ones, down to 90% of the cap"""
+        total = self._counter(db, "bytes")
+        if total <= self.max_bytes:
+            return
+        freed = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses WHERE expires <= ?",
+                           (now,)).fetchone()[0]
+        db.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+        target = self.max_bytes * 0.9
+        evicted = 0
+        if total - freed > target:
+            rows = db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+            keys = []
+            for key, size in rows:
+                if total - freed <= target:
+                    break
+                keys.append((key,))
+                freed += size
+            db.executemany("DELETE FROM responses WHERE key = ?", keys)
+            evicted = len(keys)
+        self._count(db, "bytes", -freed)
+        self._count(db, "evictions", evicted)
+
+    def _counter(self, db: sqlite3.Connection, name: str) -> int:
+        row = db.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def stats(self) -> dict:
+        """Entry count, size and lifetime hit/miss/store/eviction counters"""
+        self.flush()
+        db = self._db()
+        entries = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        counters = dict(db.execute("SELECT name, value FROM counters").fetchall())
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": counters.get("bytes", 0),
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "stores": counters.get("stores", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+    def purge(self) -> int:
+        """Delete expired entries; returns how many were removed"""
+        db = self._db()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            freed, removed = db.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses WHERE expires <= ?",
+                (now,),
+            ).fetchone()
+            db.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+            self._count(db, "bytes", -freed)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return removed
+
+    def clear(self):
+        """Delete every entry and reset the counters"""
+        db = self._db()
+        db.execute("DELETE FROM responses")
+        db.execute("DELETE FROM counters")
+        db.execute("VACUUM")
+
+
+_cache = None
+_enabled = CACHE_ENABLED
+
+
+def get_cache() -> ApiCache:
+    """The shared cache, or None when caching is disabled"""
+    global _cache
+    if not _enabled:
+        return None
+    if _cache is None:
+        _cache = ApiCache()
+    return _cache
+
+
+def configure(enabled: bool = None, path: str = None, max_bytes: int = None):
+    """Enable/disable the shared cache or point it at another database"""
+    global _cache, _enabled
+    if enabled is not None:
+        _enabled = enabled
+    if path is not None or max_bytes is not None:
+        _cache = ApiCache(path, max_bytes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clean the DataForSEO response cache")
+    parser.add_argument("--stats", action="store_true", help="Show size and hit/miss counters")
+    parser.add_argument("--purge", action="store_true", help="Delete expired entries")
+    parser.add_argument("--clear", action="store_true", help="Delete everything")
+    args = parser.parse_args()
+
+    cache = ApiCache()
+    if args.clear:
+        cache.clear()
+        print("cleared: true")
+    if args.purge:
+        print(f"purged: {cache.purge()}")
+    if args.stats or not (args.clear or args.purge):
+        for name, value in cache.stats().items():
+            print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Resumable, paginated export of DataForSEO backlinks and ranked keywords
+
+Pages are pulled one at a time with the endpoint's cursor (search_after_token
+for backlinks, offset_token for ranked keywords, plain offset otherwise) and
+appended to a JSONL or CSV file as they arrive, so memory stays flat however
+many rows the domain has. After every page a checkpoint next to the output
+records the cursor and the file size; an interrupted export is resumed from
+the last complete page, and a partly written page is cut off first. The
+checkpoint is removed once the export is complete.
+
+Usage: python3 scripts/dataforseo_export.py backlinks example.com -o backlinks.jsonl
+       python3 scripts/dataforseo_export.py ranked_keywords example.com -o keywords.csv
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from dataforseo_api import OK_STATUS, DataForSEOError, format_count, post_json, run_cli
+
+PAGE_SIZE = 1000  # The maximum both endpoints accept per request
+
+# Export kind -> endpoint, cursor field, default task fields and CSV columns.
+# Columns are (header, path into the item).
+EXPORTS = {
+    "backlinks": {
+        "endpoint": "backlinks/backlinks/live",
+        "cursor": "search_after_token",
+        "task": {"mode": "as_is", "order_by": ["rank,desc"]},
+        "columns": [
+            ("url_from", ("url_from",)),
+            ("url_to", ("url_to",)),
+            ("domain_from", ("domain_from",)),
+            ("rank", ("rank",)),
+            ("page_from_rank", ("page_from_rank",)),
+            ("dofollow", ("dofollow",)),
+            ("anchor", ("anchor",)),
+            ("item_type", ("item_type",)),
+            ("first_seen", ("first_seen",)),
+            ("last_seen", ("last_seen",)),
+        ],
+    },
+    "ranked_keywords": {
+        "endpoint": "dataforseo_labs/google/ranked_keywords/live",
+        "cursor": "offset_token",
+        "task": {"language_code": "en", "order_by": ["keyword_data.keyword_info.search_volume,desc"]},
+        "columns": [
+            ("keyword", ("keyword_data", "keyword")),
+            ("search_volume", ("keyword_data", "keyword_info", "search_volume")),
+            ("cpc", ("keyword_data", "keyword_info", "cpc")),
+            ("keyword_difficulty", ("keyword_data", "keyword_properties", "keyword_difficulty")),
+            ("position", ("ranked_serp_element", "serp_item", "rank_group")),
+            ("url", ("ranked_serp_element", "serp_item", "url")),
+            ("etv", ("ranked_serp_element", "serp_item", "etv")),
+        ],
+    },
+}
+
+
+def pluck(item: dict, path: tuple):
+    """Follow a key path into nested dicts, returning None if any step is missing"""
+    for key in path:
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+def paginate(endpoint: str, task: dict, cursor_field: str = None, page_size: int = PAGE_SIZE,
+             offset: int = 0, cursor: str = None, max_rows: int = None):
+    """Yield (items, total_count, offset, cursor) for each page of a paged live endpoint.
+
+    The returned offset and cursor are the position after that page, so
+    passing them back in continues the export. Stops at the last page or
+    after max_rows. Pages bypass the response cache; a full export would
+    otherwise flush it.
+    """
+    fetched = 0
+    while max_rows is None or fetched < max_rows:
+        # Shrink the last request rather than dropping rows past the cursor
+        size = page_size if max_rows is None else min(page_size, max_rows - fetched)
+        page = {**task, "limit": size}
+        if cursor:
+            page[cursor_field] = cursor
+        elif offset:
+            page["offset"] = offset
+        response = post_json(endpoint, [page])
+        tasks = response.get("tasks") or [response]
+        if tasks[0].get("status_code") != OK_STATUS:
+            raise DataForSEOError(tasks[0].get("status_message") or "Unknown error",
+                                  tasks[0].get("status_code"))
+        result = (tasks[0].get("result") or [{}])[0] or {}
+        items = result.get("items") or []
+        offset += len(items)
+        fetched += len(items)
+        cursor = result.get(cursor_field) if cursor_field else None
+        yield items, result.get("total_count"), offset, cursor
+        if len(items) < size:
+            return
+
+
+class Checkpoint:
+    """Export position saved atomically next to the output file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, state: dict):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def export(kind: str, target: str, output: str, fmt: str = None, task: dict = None,
+           page_size: int = PAGE_SIZE, max_rows: int = None, restart: bool = False,
+           progress=None) -> dict:
+    """Stream every row of an export to output, resuming from its checkpoint.
+
+    Returns {"rows", "total_count", "pages", "resumed", "complete"}; complete is
+    False when max_rows stopped the export early. Raises ValueError if the
+    checkpoint belongs to a different export.
+    """
+    spec = EXPORTS[kind]
+    fmt = fmt or ("csv" if output.endswith(".csv") else "jsonl")
+    task = {**spec["task"], **(task or {}), "target": target}
+    checkpoint = Checkpoint(f"{output}.checkpoint")
+
+    state = None if restart else checkpoint.load()
+    if state and (state.get("endpoint") != spec["endpoint"] or state.get("task") != task
+                  or state.get("format") != fmt):
+        raise ValueError(f"{checkpoint.path} belongs to another export")
+    if state is None or not os.path.exists(output):
+        state = {"endpoint": spec["endpoint"], "task": task, "format": fmt,
+                 "offset": 0, "cursor": None, "rows": 0, "bytes": 0, "pages": 0, "total_count": None}
+    resumed = state["pages"] > 0
+
+    # Drop anything written after the last checkpoint (a page cut off mid-write)
+    with open(output, "r+b" if resumed else "wb") as f:
+        f.truncate(state["bytes"])
+        f.seek(state["bytes"])
+        columns = spec["columns"]
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="", write_through=True)
+        writer = csv.writer(text) if fmt == "csv" else None
+        if writer and state["bytes"] == 0:
+            writer.writerow([name for name, _ in columns])
+
+        remaining = None if max_rows is None else max(0, max_rows - state["rows"])
+        for items, total_count, offset, cursor in paginate(spec["endpoint"], task, spec["cursor"],
+                                                           page_size, state["offset"],
+                                                           state["cursor"], remaining):
+            for item in items:
+                if writer:
+                    writer.writerow([pluck(item, path) for _, path in columns])
+                else:
+                    text.write(json.dumps(item, separators=(",", ":")) + "\n")
+            text.flush()
+            state.update(offset=offset, cursor=cursor, bytes=f.tell(), pages=state["pages"] + 1,
+                         rows=state["rows"] + len(items), total_count=total_count)
+            checkpoint.save(state)
+            if progress:
+                progress(state)
+        text.detach()
+
+    complete = max_rows is None or state["rows"] < max_rows
+
+    summary = {"rows": state["rows"], "total_count": state["total_count"], "pages": state["pages"],
+               "resumed": resumed, "complete": complete}
+    if complete:
+        checkpoint.remove()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export all backlinks or ranked keywords of a domain")
+    parser.add_argument("kind", choices=sorted(EXPORTS), help="What to export")
+    parser.add_argument("target", help="Target domain")
+    parser.add_argument("--output", "-o", required=True, help="Output file (.jsonl or .csv)")
+    parser.add_argument("--format", choices=["jsonl", "csv"],
+                        help="Output format (default: from the file extension, else jsonl)")
+    parser.add_argument("--location", "-loc", type=int, default=2840,
+                        help="Location code for ranked_keywords (default: 2840 = US)")
+    parser.add_argument("--max-rows", type=int, help="Stop after this many rows")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE,
+                        help=f"Rows per request (default: {PAGE_SIZE})")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    args = parser.parse_args()
+
+    task = {"location_code": args.location} if args.kind == "ranked_keywords" else {}
+
+    def progress(state: dict):
+        total = format_count(state["total_count"]) if state["total_count"] is not None else "?"
+        print(f"\rrows: {format_count(state['rows'])} / {total}", end="", file=sys.stderr, flush=True)
+
+    try:
+        summary = export(args.kind, args.target, args.output, args.format, task, args.page_size,
+                         args.max_rows, args.restart, progress)
+    except ValueError as e:
+        parser.error(f"{e}; use --restart to start over")
+    print(file=sys.stderr)
+    print(f"target: {args.target}")
+    print(f"output: {args.output}")
+    print(f"rows: {summary['rows']}")
+    print(f"total_count: {summary['total_count']}")
+    print(f"pages: {summary['pages']}")
+    print(f"resumed: {summary['resumed']}")
+    print(f"complete: {summary['complete']}")
+
+
+if __name__ == "__main__":
+    run_cli(main)
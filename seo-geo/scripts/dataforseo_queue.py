@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+DataForSEO standard queue (task_post / tasks_ready / task_get)
+
+Standard-queue tasks cost a fraction of the live price. QueueJob posts tasks
+in batches of 100, a background poller drains tasks_ready, and finished
+tasks are fetched concurrently and yielded as they complete. Every posted
+task ID is appended to a job file, so a crashed run resumes with its
+already-submitted tasks instead of posting (and paying for) them again.
+
+Usage: python3 scripts/dataforseo_queue.py serp/google/organic/live/advanced tasks.jsonl \\
+           --job serp-job.jsonl --output results.jsonl
+"""
+import argparse
+import hashlib
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataforseo_api import (CREATED_STATUS, OK_STATUS, DataForSEOError, api_post_batch, get_json,
+                            run_cli)
+
+POLL_INTERVAL = 10
+# task_get answers for tasks that are still being processed
+NOT_READY_STATUSES = (40601, 40602)
+
+
+def queue_endpoints(live_endpoint: str) -> tuple:
+    """Map a live endpoint to its (task_post, tasks_ready, task_get) endpoints"""
+    base, _, variant = live_endpoint.partition("/live")
+    variant = variant.strip("/")  # "advanced", "regular", "html" or ""
+    task_get = f"{base}/task_get/{variant}" if variant else f"{base}/task_get"
+    return f"{base}/task_post", f"{base}/tasks_ready", task_get
+
+
+def task_key(data: dict) -> str:
+    """Stable identity of a task payload, used to skip tasks already posted"""
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode()).hexdigest()[:20]
+
+
+class QueueJob:
+    """Runs tasks through the standard queue, resumable through a job file"""
+
+    def __init__(self, live_endpoint: str, job_file: str = None,
+                 poll_interval: float = POLL_INTERVAL, concurrency: int = 4):
+        self.post_endpoint, self.ready_endpoint, self.get_endpoint = queue_endpoints(live_endpoint)
+        self.job_file = job_file
+        self.poll_interval = poll_interval
+        self.concurrency = concurrency
+        self.posted = {}   # task key -> task id
+        self.data = {}     # task id -> posted payload
+        self.done = set()  # task ids whose results have been handed out
+        self.failed = []   # tasks that could not be posted: {"data", "error"}
+        self._lock = threading.Lock()
+        if job_file:
+            self._load()
+        # Tasks posted by an earlier run may already have been collected
+        # from tasks_ready, so they are fetched directly once
+        self._resumed = self.pending
+
+    def _load(self):
+        try:
+            f = open(self.job_file)
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # A torn last line from a crash
+                if "posted" in record:
+                    self.posted[record["posted"]] = record["id"]
+                    self.data[record["id"]] = record["data"]
+                elif "done" in record:
+                    self.done.add(record["done"])
+
+    def _record(self, record: dict):
+        if self.job_file:
+            with self._lock, open(self.job_file, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    @property
+    def pending(self) -> set:
+        """Posted task ids whose results have not been handed out yet"""
+        return set(self.data) - self.done
+
+    def submit(self, tasks: list) -> int:
+        """Post the tasks this job has not posted yet; returns how many were posted"""
+        keys, new = [], []
+        seen = set(self.posted)
+        for data in tasks:
+            key = task_key(data)
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+                new.append(data)
+
+        posted = 0
+        for key, data, task in zip(keys, new, api_post_batch(self.post_endpoint, new,
+                                                            concurrency=self.concurrency)):
+            if task.get("status_code") == CREATED_STATUS and task.get("id"):
+                self.posted[key] = task["id"]
+                self.data[task["id"]] = data
+                self._record({"posted": key, "id": task["id"], "data": data})
+                posted += 1
+            else:
+                self.failed.append({"data": data, "error": task.get("status_message") or "Unknown error"})
+        return posted
+
+    def results(self, timeout: float = None):
+        """Yield (data, task) for each pending task as it completes.
+
+        A background thread polls tasks_ready and finished tasks are fetched
+        concurrently. A fetch that fails in transit is retried with task_get
+        directly every poll interval: DataForSEO may already count the task
+        as collected and never list it in tasks_ready again. A task that
+        failed at DataForSEO is yielded with its error status. Stops when
+        nothing is pending or after timeout seconds.
+        """
+        remaining = self.pending
+        if not remaining:
+            return
+        completed = queue.Queue()
+        stop = threading.Event()
+        in_flight = set()
+        retry_at = {}  # task id -> time of its next direct task_get
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+        def fetch(task_id: str):
+            try:
+                response = get_json(f"{self.get_endpoint}/{task_id}")
+            except DataForSEOError:
+                completed.put((task_id, None))
+                return
+            tasks = response.get("tasks") or []
+            completed.put((task_id, tasks[0] if tasks else None))
+
+        def start(task_id: str):
+            with self._lock:
+                if task_id in in_flight:
+                    return
+                in_flight.add(task_id)
+            executor.submit(fetch, task_id)
+
+        def poll():
+            while not stop.is_set():
+                try:
+                    response = get_json(self.ready_endpoint)
+                except DataForSEOError:
+                    response = {}
+                for task in response.get("tasks") or []:
+                    for entry in task.get("result") or []:
+                        if entry.get("id") in remaining:
+                            start(entry["id"])
+                stop.wait(self.poll_interval)
+
+        for task_id in self._resumed & remaining:
+            start(task_id)
+        self._resumed = set()
+        poller = threading.Thread(target=poll, daemon=True)
+        poller.start()
+
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            while remaining:
+                now = time.monotonic()
+                for task_id in [task_id for task_id, at in retry_at.items() if at <= now]:
+                    del retry_at[task_id]
+                    start(task_id)
+                wait = 1.0 if deadline is None else min(1.0, deadline - now)
+                if wait <= 0:
+                    break
+                try:
+                    task_id, task = completed.get(timeout=wait)
+                except queue.Empty:
+                    continue
+                with self._lock:
+                    in_flight.discard(task_id)
+                if task is None:
+                    retry_at[task_id] = time.monotonic() + self.poll_interval
+                    continue
+                if task.get("status_code") in NOT_READY_STATUSES:
+                    continue  # Still processing; tasks_ready will list it when done
+                remaining.discard(task_id)
+                yield self.data[task_id], task
+                self.done.add(task_id)
+                self._record({"done": task_id, "status_code": task.get("status_code")})
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def read_tasks(path: str):
+    """Read task payloads (one JSON object per line) from a file or stdin for "-"."""
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        return [json.loads(line) for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run DataForSEO tasks through the standard queue")
+    parser.add_argument("endpoint",
+                        help="Live endpoint to queue for, e.g. serp/google/organic/live/advanced")
+    parser.add_argument("tasks", help="JSONL file of task payloads (- for stdin)")
+    parser.add_argument("--job", "-j", help="Job file that makes the run resumable")
+    parser.add_argument("--output", "-o", help="Append results as JSONL here (default: stdout)")
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL,
+                        help=f"Seconds between tasks_ready polls (default: {POLL_INTERVAL})")
+    parser.add_argument("--concurrency", "-c", type=int, default=4,
+                        help="Parallel task_post / task_get requests (default: 4)")
+    parser.add_argument("--timeout", type=float,
+                        help="Stop waiting after this many seconds (resume later with --job)")
+    args = parser.parse_args()
+
+    job = QueueJob(args.endpoint, args.job, args.poll, args.concurrency)
+    posted = job.submit(read_tasks(args.tasks))
+    print(f"posted: {posted}, pending: {len(job.pending)}, failed: {len(job.failed)}", file=sys.stderr)
+    for failure in job.failed:
+        print(f"error: {failure['error']} - {json.dumps(failure['data'])}", file=sys.stderr)
+
+    out = open(args.output, "a") if args.output else sys.stdout
+    received = 0
+    try:
+        for data, task in job.results(timeout=args.timeout):
+            out.write(json.dumps({
+                "data": data,
+                "status_code": task.get("status_code"),
+                "status_message": task.get("status_message"),
+                "cost": task.get("cost"),
+                "result": task.get("result") if task.get("status_code") == OK_STATUS else None,
+            }) + "\n")
+            out.flush()
+            received += 1
+    finally:
+        if args.output:
+            out.close()
+
+    pending = len(job.pending)
+    print(f"received: {received}, still pending: {pending}", file=sys.stderr)
+    sys.exit(1 if pending or job.failed else 0)
+
+
+if __name__ == "__main__":
+    run_cli(main)
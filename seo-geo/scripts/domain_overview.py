@@ -2,43 +2,145 @@
 """
 Domain overview using DataForSEO API
 Usage: python3 scripts/domain_overview.py "example.com"
+       python3 scripts/domain_overview.py "example.com" --export keywords.csv
+       python3 scripts/domain_overview.py "a.com" "b.com" "c.com" --concurrency 8
+       python3 scripts/domain_overview.py --domains-file competitors.txt
 """
 import argparse
-from dataforseo_api import api_post, get_result, format_count
+import sys
+from dataforseo_api import (api_post, api_post_batch, get_result, format_count, run_cli,
+                            task_error, task_result)
+from dataforseo_export import export
+
+# One task per domain; only returns the metrics block, unlike ranked_keywords
+BULK_ENDPOINT = "dataforseo_labs/google/domain_rank_overview/live"
+
+
+def read_domains(path: str) -> list:
+    """Read domains from a file (or stdin for "-"), one per line"""
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def organic_metrics(result: dict) -> dict:
+    """The organic metrics block of a ranked_keywords or domain_rank_overview result"""
+    metrics = result.get("metrics")
+    if not metrics:
+        items = result.get("items") or [{}]
+        metrics = items[0].get("metrics") or {}
+    return metrics.get("organic") or {}
+
+
+def overview_row(domain: str, organic: dict) -> dict:
+    return {
+        "domain": domain,
+        "organic_keywords": organic.get("count") or 0,
+        "organic_traffic": organic.get("etv") or 0,
+        "top_3_positions": (organic.get("pos_1") or 0) + (organic.get("pos_2_3") or 0),
+    }
+
+
+def bulk_overview(domains: list, location: int, concurrency: int = 4) -> list:
+    """Overview rows for many domains, requested concurrently (and cached per domain).
+
+    Returns one row per domain in input order; failed domains carry "error".
+    """
+    tasks = api_post_batch(BULK_ENDPOINT, [{
+        "target": domain,
+        "location_code": location,
+        "language_code": "en",
+    } for domain in domains], concurrency=concurrency)
+
+    rows = []
+    for domain, task in zip(domains, tasks):
+        error = task_error(task)
+        results = task_result(task)
+        row = overview_row(domain, organic_metrics(results[0] or {}) if results else {})
+        if error:
+            row["error"] = error
+        rows.append(row)
+    return rows
+
+
+def print_overview_table(rows: list, location: int):
+    """Print one table of domains, highest traffic first"""
+    ok = sorted((row for row in rows if "error" not in row),
+                key=lambda row: row["organic_traffic"], reverse=True)
+    print(f"location: {location}")
+    print(f"domains[{len(ok)}]{{domain,organic_keywords,organic_traffic,top_3_positions}}:")
+    for row in ok:
+        print(f"  {row['domain']},{format_count(row['organic_keywords'])},"
+              f"{format_count(row['organic_traffic'])},{row['top_3_positions']}")
+    failed = [row for row in rows if "error" in row]
+    if failed:
+        print(f"errors[{len(failed)}]{{domain,error}}:")
+        for row in failed:
+            print(f"  {row['domain']},{row['error']}")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Domain overview")
-    parser.add_argument("domain", help="Target domain")
+    parser.add_argument("domain", nargs="*", help="Target domain(s)")
+    parser.add_argument("--domains-file", "-f",
+                        help="File with one domain per line (- for stdin)")
     parser.add_argument("--location", "-loc", type=int, default=2840,
                         help="Location code (default: 2840 = US)")
+    parser.add_argument("--concurrency", "-c", type=int, default=4,
+                        help="Parallel requests for multiple domains (default: 4)")
+    parser.add_argument("--export", metavar="FILE",
+                        help="Stream every ranked keyword to a .jsonl/.csv file (resumable)")
     args = parser.parse_args()
 
+    domains = list(args.domain)
+    if args.domains_file:
+        domains.extend(read_domains(args.domains_file))
+    domains = list(dict.fromkeys(domains))
+    if not domains:
+        parser.error("a domain or --domains-file is required")
+
+    if len(domains) > 1:
+        if args.export:
+            parser.error("--export takes a single domain")
+        print_overview_table(bulk_overview(domains, args.location, args.concurrency), args.location)
+        return
+
+    domain = domains[0]
+    if args.export:
+        summary = export("ranked_keywords", domain, args.export,
+                         task={"location_code": args.location})
+        print(f"domain: {domain}")
+        print(f"exported: {summary['rows']} ranked keywords to {args.export}")
+        return
+
     data = [{
-        "target": args.domain,
+        "target": domain,
         "location_code": args.location,
         "language_code": "en",
         "limit": 1  # We only need overview metrics
     }]
-    
+
     response = api_post("dataforseo_labs/google/ranked_keywords/live", data)
     results = get_result(response)
-    
-    print(f"domain: {args.domain}")
+
+    print(f"domain: {domain}")
     print(f"location: {args.location}")
-    
+
     if results:
         for result in results:
-            metrics = result.get("metrics", {})
-            if not metrics:
+            organic = organic_metrics(result)
+            if not organic:
                 continue
-            organic = metrics.get("organic", {})
-            print(f"organic_keywords: {format_count(organic.get('count', 0))}")
-            print(f"organic_traffic: {format_count(organic.get('etv', 0))}")
-            print(f"top_3_positions: {organic.get('pos_1', 0) + organic.get('pos_2_3', 0)}")
+            row = overview_row(domain, organic)
+            print(f"organic_keywords: {format_count(row['organic_keywords'])}")
+            print(f"organic_traffic: {format_count(row['organic_traffic'])}")
+            print(f"top_3_positions: {row['top_3_positions']}")
     else:
         print("No results found")
 
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
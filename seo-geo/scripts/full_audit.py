@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Combined SEO + GEO audit: one fetch, one parse, one JSON document
+
+Downloads the page once (as an AI crawler), runs seo_audit.extract_meta over
+the raw HTML and hands the same HTML to GeoAuditor, while robots.txt,
+sitemap.xml and /.well-known/agent-facts are fetched in parallel over the
+shared connection pool.
+
+Usage: python3 scripts/full_audit.py "https://example.com" --launch-year 2021
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from concurrent.futures import wait
+from datetime import datetime
+from http_client import DaemonExecutor, configure
+from seo_audit import check_robots, check_sitemap, extract_meta
+
+
+def load_audit_geo():
+    """Import audit-geo.py as a module (its filename is not importable)"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit-geo.py")
+    spec = importlib.util.spec_from_file_location("audit_geo", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_full_audit(url: str, launch_year: int = None, deadline: float = 30,
+                   market: str = None) -> dict:
+    """Run the SEO and GEO audits against one download of the page"""
+    audit_geo = load_audit_geo()
+    auditor = audit_geo.GeoAuditor(url, launch_year, market)
+
+    # Daemon workers: fetches still stalled at the deadline must not delay exit
+    executor = DaemonExecutor(max_workers=4)
+    page = executor.submit(auditor.fetch_page, deadline)
+    robots = executor.submit(check_robots, url, deadline)
+    sitemap = executor.submit(check_sitemap, url, deadline * 0.9)
+    agent_facts = executor.submit(auditor.check_agent_facts)
+    wait([page, robots, sitemap, agent_facts], timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    def outcome(future, default):
+        if not future.done() or future.cancelled() or future.exception():
+            return default
+        return future.result()
+
+    if not page.done():
+        print(f"Error fetching URL: no response within {deadline:g}s", file=sys.stderr)
+        return None
+    if page.exception():
+        print(f"Error fetching URL: {page.exception()}", file=sys.stderr)
+        return None
+    response = page.result()
+
+    raw_html = response.text
+    meta = extract_meta(raw_html)
+    auditor.load_html(raw_html, response.size, response.truncated, response.transferred)
+
+    return {
+        "url": url,
+        "timestamp": datetime.now().isoformat(),
+        "seo": {
+            "meta": meta,
+            "load_time": round(response.elapsed, 3),
+            "robots": outcome(robots, {"exists": False, "ai_bots": []}),
+            "sitemap": outcome(sitemap, {"exists": False, "sitemaps": 0, "url_count": 0, "complete": False}),
+        },
+        "geo": {
+            "technical": auditor.audit_technical(),
+            "content": auditor.audit_content(),
+            "agent_facts": outcome(agent_facts, {"present": False, "error": "Could not fetch"}),
+            "strategy": auditor.assess_discovery_strategy(),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Combined SEO + GEO audit (single fetch)")
+    parser.add_argument("url", help="URL to audit")
+    parser.add_argument("--launch-year", type=int,
+                        help="Year the site launched (for strategy recommendations)")
+    parser.add_argument("--market",
+                        help="Market or language whose hedge lexicon is added to English (e.g. JP, DE, FR)")
+    parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    parser.add_argument("--timeout", "-t", type=float, default=30,
+                        help="Overall deadline in seconds for all fetches (default: 30)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the on-disk HTTP cache and refetch everything")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        configure(cache=False)
+
+    url = args.url
+    if not url.startswith("http"):
+        url = f"https://{url}"
+
+    results = run_full_audit(url, args.launch_year, args.timeout, args.market)
+    if results is None:
+        sys.exit(1)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+        print(f"Report saved to: {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
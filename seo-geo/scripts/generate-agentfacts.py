@@ -13,10 +13,7 @@ import json
 import sys
 from datetime import datetime
 
-try:
-    import requests
-except ImportError:
-    requests = None  # Will auto-install if validation is used
+from http_client import FetchError, fetch
 
 
 def generate_agent_facts(
@@ -91,26 +88,18 @@ def validate_agent_facts(url_or_schema) -> dict:
     warnings = []
 
     # Fetch if URL
-    global requests
     if isinstance(url_or_schema, str) and url_or_schema.startswith("http"):
-        if requests is None:
-            import subprocess
-            print("Installing required packages...", file=sys.stderr)
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "requests"])
-            import requests as _requests
-            requests = _requests
-
         try:
-            response = requests.get(url_or_schema, timeout=10)
-            if response.status_code != 200:
+            response = fetch(url_or_schema)
+            if response.status != 200:
                 return {
                     "valid": False,
-                    "errors": [f"HTTP {response.status_code}"],
+                    "errors": [f"HTTP {response.status}"],
                 }
             schema = response.json()
-        except requests.RequestException as e:
+        except FetchError as e:
             return {"valid": False, "errors": [str(e)]}
-        except json.JSONDecodeError:
+        except ValueError:
             return {"valid": False, "errors": ["Invalid JSON"]}
     else:
         schema = url_or_schema
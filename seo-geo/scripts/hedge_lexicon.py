@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Shared hedge lexicon for audit-geo.py and check-hedge-density.py
+
+The English lexicon is built in. Other languages live in lexicons/<lang>.json
+and are only read when a market that needs them is requested. Each lexicon is
+compiled once per process into a single prefix-trie regex and cached.
+
+Usage:
+    from hedge_lexicon import get_lexicon
+    lexicon = get_lexicon("DE")
+    hits = lexicon.scan(text)          # [(start, end, pattern_order), ...]
+    words = lexicon.count_words(text)
+    heatmap = hedge_heatmap(text, hits, lexicon)
+"""
+import bisect
+import hashlib
+import json
+import os
+import re
+
+LEXICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicons")
+
+# Markets whose content is not English, mapped to their lexicon pack
+MARKET_LANGUAGES = {
+    "JP": "ja",
+    "DE": "de",
+    "AT": "de",
+    "CH": "de",
+    "FR": "fr",
+    "BE": "fr",
+}
+
+# Hiragana, katakana, CJK ideographs and halfwidth katakana
+CJK_CHAR = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uff66-\uff9f]")
+
+# Sentence terminators (with closing quotes/brackets) or a blank line
+SENTENCE_BREAK = re.compile(
+    r"[.!?]+[\"')\]\u201d\u2019]*\s+|[\u3002\uff01\uff1f]+[\u300d\u300f\uff09]*\s*|\n\s*\n"
+)
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+HOTSPOT_PREVIEW_CHARS = 160
+
+# Hedge phrases by category; matched case-insensitively on word boundaries
+HEDGE_PATTERNS = {
+    "uncertainty": ["maybe", "possibly", "perhaps", "might", "could be", "potentially"],
+    "contrast": ["however", "although", "nevertheless", "nonetheless"],
+    "perception": ["it seems", "it appears", "arguably", "apparently"],
+    "opinion": ["in my opinion", "some believe", "to some extent", "I think", "I believe"],
+}
+
+
+def _trie_regex(phrases) -> str:
+    """Build a prefix-trie alternation so each text position is tried once per character"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return body + "?" if "" in node else body
+
+    return build(trie)
+
+
+class Lexicon:
+    """A compiled hedge lexicon: one regex over every phrase plus match lookups"""
+
+    def __init__(self, languages: tuple, packs: list):
+        self.languages = languages
+        self.cjk = False
+        # Lowercased phrase -> (name, category, pattern_order)
+        self.lookup = {}
+        bounded, unbounded = [], []
+        for pack in packs:
+            for category, names in pack["patterns"].items():
+                for name in names:
+                    key = name.lower()
+                    if key in self.lookup:
+                        continue
+                    self.lookup[key] = (name, category, len(self.lookup))
+                    # CJK text has no spaces, so word boundaries cannot be required
+                    (unbounded if pack.get("cjk") else bounded).append(key)
+            self.cjk = self.cjk or bool(pack.get("cjk"))
+
+        alternatives = []
+        if bounded:
+            alternatives.append(r"\b(?:" + _trie_regex(bounded) + r")\b")
+        if unbounded:
+            alternatives.append("(?:" + _trie_regex(unbounded) + ")")
+        body = "|".join(alternatives)
+        self.regex = re.compile(body)
+        self.ignorecase_regex = re.compile(body, re.IGNORECASE)
+        self.entries = list(self.lookup.values())
+        self.categories = list(dict.fromkeys(category for _, category, _ in self.entries))
+        self.longest = max(len(key) for key in self.lookup)
+        self.fingerprint = hashlib.sha1(body.encode()).hexdigest()[:16]
+
+    def scan(self, text: str) -> list:
+        """Return (start, end, pattern_order) for every hedge in text, in text order."""
+        # Matching the lowercased text is much faster than IGNORECASE; it is
+        # only skipped when lowercasing would shift character offsets.
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            matches = self.regex.finditer(lowered)
+        else:
+            matches = self.ignorecase_regex.finditer(text)
+        return [(m.start(), m.end(), self.entry(m.group())[2]) for m in matches]
+
+    def entry(self, phrase: str) -> tuple:
+        """(name, category, pattern_order) of a phrase matched by regex or ignorecase_regex."""
+        entry = self.lookup.get(phrase.lower())
+        if entry is None:
+            # IGNORECASE folds one character at a time ("İ" matches "i"), but
+            # str.lower() can expand a character ("İ" -> "i̇"), so compare the
+            # same-length phrases the way the regex did
+            entry = next(value for key, value in self.lookup.items()
+                         if len(key) == len(phrase)
+                         and re.fullmatch(re.escape(key), phrase, re.IGNORECASE))
+        return entry
+
+    def count_words(self, text: str) -> int:
+        """Count whitespace-separated words; each CJK character counts as one word."""
+        if not self.cjk:
+            return len(text.split())
+        words = len(CJK_CHAR.sub(" ", text).split())
+        return words + len(CJK_CHAR.findall(text))
+
+    def is_word_char(self, ch: str) -> bool:
+        """True if ch continues a word, i.e. two such characters belong to one word."""
+        return not ch.isspace() and not (self.cjk and CJK_CHAR.match(ch))
+
+
+_packs = {}
+_lexicons = {}
+
+
+def language_for_market(market: str = None) -> str:
+    """Map a market (US, JP, DE...) or language code (ja, de...) to a lexicon language."""
+    if not market:
+        return "en"
+    if market.lower() in available_languages():
+        return market.lower()
+    return MARKET_LANGUAGES.get(market.upper(), "en")
+
+
+def available_languages() -> list:
+    """Languages with a lexicon: English plus every pack in lexicons/."""
+    try:
+        packs = sorted(name[:-5] for name in os.listdir(LEXICON_DIR) if name.endswith(".json"))
+    except OSError:
+        packs = []
+    return ["en"] + packs
+
+
+def load_pack(language: str) -> dict:
+    """Load a language pack (cached); English is built in."""
+    if language not in _packs:
+        if language == "en":
+            _packs[language] = {"patterns": HEDGE_PATTERNS}
+        else:
+            with open(os.path.join(LEXICON_DIR, f"{language}.json"), encoding="utf-8") as f:
+                _packs[language] = json.load(f)
+    return _packs[language]
+
+
+def get_lexicon(market: str = None) -> Lexicon:
+    """Return the compiled lexicon for a market (cached per process).
+
+    Non-English markets get their language pack on top of English, since
+    English phrasing is common on localized pages.
+    """
+    language = language_for_market(market)
+    languages = ("en",) if language == "en" else ("en", language)
+    if languages not in _lexicons:
+        _lexicons[languages] = Lexicon(languages, [load_pack(lang) for lang in languages])
+    return _lexicons[languages]
+
+
+class SentenceIndex:
+    """Sentence spans and their paragraph numbers, built in one pass over the text.
+
+    Offsets are kept in sorted arrays so any character position is mapped to
+    its sentence by binary search.
+    """
+
+    def __init__(self, text: str):
+        self.starts = []
+        self.ends = []
+        self.paragraphs = []
+        paragraph = 0
+        start = len(text) - len(text.lstrip())
+        for separator in SENTENCE_BREAK.finditer(text, start):
+            gap = separator.group()
+            end = separator.start() + len(gap.rstrip())
+            if end > start:
+                self._add(start, end, paragraph)
+            if PARAGRAPH_BREAK.search(gap):
+                paragraph += 1
+            start = separator.end()
+        end = len(text.rstrip())
+        if end > start:
+            self._add(start, end, paragraph)
+
+    def _add(self, start: int, end: int, paragraph: int):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.paragraphs.append(paragraph)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def locate(self, position: int) -> int:
+        """Index of the sentence containing position, or -1 before the first one."""
+        return bisect.bisect_right(self.starts, position) - 1
+
+
+def hedge_heatmap(text: str, hits: list, lexicon: Lexicon, index: SentenceIndex = None) -> dict:
+    """Per-sentence and per-paragraph hedge density for Lexicon.scan() hits.
+
+    Each hit is assigned to its sentence by binary search over the offset
+    index; words are counted once per sentence, so the cost stays linear.
+    """
+    index = index or SentenceIndex(text)
+    found = [[] for _ in range(len(index))]
+    for start, _, order in hits:
+        sentence = index.locate(start)
+        if sentence >= 0:
+            found[sentence].append(lexicon.entries[order][0])
+
+    sentences = []
+    paragraphs = []
+    for i, (start, end, paragraph) in enumerate(zip(index.starts, index.ends, index.paragraphs)):
+        words = lexicon.count_words(text[start:end])
+        hedges = len(found[i])
+        sentences.append({
+            "sentence": i,
+            "paragraph": paragraph,
+            "start": start,
+            "end": end,
+            "words": words,
+            "hedges": hedges,
+            "density": round(hedges / words * 100, 1) if words else 0.0,
+            "found": found[i],
+        })
+        if not paragraphs or paragraphs[-1]["paragraph"] != paragraph:
+            paragraphs.append({"paragraph": paragraph, "start": start, "end": end,
+                               "sentences": 0, "words": 0, "hedges": 0})
+        paragraphs[-1]["end"] = end
+        paragraphs[-1]["sentences"] += 1
+        paragraphs[-1]["words"] += words
+        paragraphs[-1]["hedges"] += hedges
+    for entry in paragraphs:
+        entry["density"] = round(entry["hedges"] / entry["words"] * 100, 1) if entry["words"] else 0.0
+
+    return {"sentences": sentences, "paragraphs": paragraphs}
+
+
+def hotspots(text: str, heatmap: dict, top: int = 5) -> list:
+    """The sentences with the most hedges (then highest density), with a text preview."""
+    ranked = sorted(
+        (entry for entry in heatmap["sentences"] if entry["hedges"]),
+        key=lambda entry: (-entry["hedges"], -entry["density"], entry["sentence"]),
+    )[:top]
+    results = []
+    for entry in ranked:
+        preview = " ".join(text[entry["start"]:entry["end"]].split())
+        if len(preview) > HOTSPOT_PREVIEW_CHARS:
+            preview = preview[:HOTSPOT_PREVIEW_CHARS - 3] + "..."
+        results.append({**entry, "text": preview})
+    return results
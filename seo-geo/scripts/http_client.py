@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the audit scripts (stdlib only)
+
+Connections are kept alive and pooled per host, so the page, robots.txt,
+sitemap.xml and /.well-known/agent-facts requests to one site reuse the
+same TLS connection. All fetch paths share one User-Agent, timeout and
+per-host connection limit, set through environment variables or configure().
+
+Bodies are read as a stream and capped at max_bytes (SEO_GEO_MAX_BYTES,
+default 10 MB): the download is aborted once the cap is passed, and the
+response records the bytes actually transferred plus the full size when
+the server declared it.
+
+Responses that carry an ETag or Last-Modified validator are stored in an
+on-disk cache and revalidated with conditional GETs on later runs, so an
+unchanged robots.txt or sitemap comes back as a cheap 304. The cache is
+size-capped with least-recently-used eviction and can be disabled with
+SEO_GEO_NO_CACHE=1 or configure(cache=False).
+
+Usage:
+    from http_client import fetch, FetchError
+    response = fetch("https://example.com/robots.txt")
+    if response.ok:
+        print(response.text)
+"""
+import hashlib
+import http.client
+import json
+import os
+import queue
+import ssl
+import threading
+import time
+import urllib.parse
+import zlib
+from concurrent.futures import Future
+
+USER_AGENT = os.environ.get("SEO_GEO_USER_AGENT", "SEO-GEO-Audit/1.0")
+AI_CRAWLER_USER_AGENT = "ClaudeBot/1.0 (compatible; AI-Search-Crawler)"
+TIMEOUT = float(os.environ.get("SEO_GEO_TIMEOUT", "15"))
+MAX_PER_HOST = int(os.environ.get("SEO_GEO_MAX_PER_HOST", "6"))
+MAX_REDIRECTS = 5
+MAX_BYTES = int(os.environ.get("SEO_GEO_MAX_BYTES", str(10 * 1024 * 1024)))
+CACHE_DIR = os.environ.get(
+    "SEO_GEO_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "seo-geo", "http"),
+)
+CACHE_MAX_BYTES = int(float(os.environ.get("SEO_GEO_CACHE_MAX_MB", "256")) * 1024 * 1024)
+CACHE_ENABLED = os.environ.get("SEO_GEO_NO_CACHE", "") in ("", "0")
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Errors that mean a pooled keep-alive connection was closed by the server
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+# Headers describing the wire format rather than the (decoded) cached body
+UNCACHED_HEADERS = {"connection", "content-encoding", "content-length", "keep-alive", "transfer-encoding"}
+
+
+class FetchError(Exception):
+    """Raised when a request fails or returns an HTTP error status"""
+
+
+class Response:
+    """A read HTTP response, possibly cut short at the client's byte cap"""
+
+    def __init__(self, url: str, status: int, headers, body: bytes, elapsed: float = 0.0,
+                 from_cache: bool = False, transferred: int = 0, truncated: bool = False,
+                 declared_size: int = None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+        self.from_cache = from_cache
+        self.transferred = transferred
+        self.truncated = truncated
+        self._declared_size = declared_size
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def size(self) -> int:
+        """Full decoded body size in bytes, or None if the download was
+        aborted and the server did not declare an uncompressed length"""
+        if not self.truncated:
+            return len(self.body)
+        return self._declared_size
+
+    @property
+    def encoding(self) -> str:
+        content_type = self.headers.get("Content-Type", "")
+        match = [p.split("=", 1)[1].strip("\"' ") for p in content_type.split(";")
+                 if p.strip().lower().startswith("charset=")]
+        return match[0] if match else "utf-8"
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.encoding, errors="ignore")
+        except LookupError:
+            return self.body.decode("utf-8", errors="ignore")
+
+    def json(self):
+        """Decode the body as JSON (raises ValueError on invalid JSON)"""
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise FetchError(f"HTTP {self.status} for {self.url}")
+
+
+class StreamResponse:
+    """An open HTTP response whose body is read incrementally.
+
+    Holds a pooled connection and its per-host slot until closed. A body
+    that was read to the end hands the connection back to the pool.
+    """
+
+    def __init__(self, client, key: tuple, conn, resp, slot, url: str, start: float):
+        self.url = url
+        self.status = resp.status
+        self.headers = resp.msg
+        self.elapsed = time.time() - start
+        self.bytes_read = 0
+        self.truncated = False
+        self._client = client
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self._slot = slot
+        self._complete = False
+        self._closed = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def raise_for_status(self):
+        if not self.ok:
+            self.close()
+            raise FetchError(f"HTTP {self.status} for {self.url}")
+
+    @property
+    def declared_size(self) -> int:
+        """Uncompressed body size from Content-Length, if the server sent one"""
+        if self.headers.get("Content-Encoding", "identity").strip().lower() != "identity":
+            return None
+        try:
+            return int(self.headers.get("Content-Length"))
+        except (TypeError, ValueError):
+            return None
+
+    def iter_chunks(self, chunk_size: int = 65536):
+        """Yield body chunks with gzip/deflate transfer compression undone"""
+        decoder = _decoder(self.headers.get("Content-Encoding"))
+        try:
+            while True:
+                chunk = self._resp.read(chunk_size)
+                if not chunk:
+                    break
+                self.bytes_read += len(chunk)
+                if not decoder:
+                    yield chunk
+                    continue
+                # Bound each decompressed piece so highly compressible bodies stay small in memory
+                while chunk:
+                    data = decoder.decompress(chunk, chunk_size)
+                    chunk = decoder.unconsumed_tail
+                    if data:
+                        yield data
+            if decoder:
+                tail = decoder.flush()
+                if tail:
+                    yield tail
+        except (OSError, http.client.HTTPException, zlib.error) as e:
+            self.close()
+            raise FetchError(f"{type(e).__name__}: {e} ({self.url})") from e
+        self._complete = True
+
+    def read(self, max_bytes: int = None) -> bytes:
+        """Read the (decoded) body, aborting once it grows past max_bytes.
+
+        A capped read returns the first max_bytes bytes, sets `truncated`
+        and drops the connection instead of draining the rest.
+        """
+        if not max_bytes:
+            return b"".join(self.iter_chunks())
+        parts = []
+        size = 0
+        for chunk in self.iter_chunks():
+            parts.append(chunk)
+            size += len(chunk)
+            if size > max_bytes:
+                self.truncated = True
+                self.close()
+                return b"".join(parts)[:max_bytes]
+        return b"".join(parts)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._complete and not self._resp.will_close:
+            self._client._checkin(self._key, self._conn)
+        else:
+            self._conn.close()
+        self._slot.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ResponseCache:
+    """On-disk store of response bodies and validators with LRU eviction.
+
+    Each entry is a `<key>.json` metadata file plus a `<key>.body` file; the
+    body file's mtime is bumped on every hit and is the LRU clock.
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = None):
+        self.directory = directory or CACHE_DIR
+        self.max_bytes = max_bytes or CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        self._size = None
+
+    def lookup(self, url: str, user_agent: str) -> dict:
+        """Return the stored entry for a URL, or None"""
+        meta_path, body_path = self._paths(url, user_agent)
+        try:
+            with open(meta_path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or not os.path.exists(body_path):
+            return None
+        entry["body_path"] = body_path
+        return entry
+
+    def load(self, entry: dict, headers=None) -> tuple:
+        """Return (status, headers, body) for a revalidated entry and mark it recently used"""
+        with open(entry["body_path"], "rb") as f:
+            body = f.read()
+        os.utime(entry["body_path"])
+        stored = http.client.HTTPMessage()
+        for name, value in entry["headers"]:
+            stored[name] = value
+        # A 304 may carry fresher validators than the stored copy
+        for name in ("ETag", "Last-Modified"):
+            if headers is not None and headers.get(name):
+                del stored[name]
+                stored[name] = headers[name]
+        return entry["status"], stored, body
+
+    def store(self, url: str, user_agent: str, status: int, headers, body: bytes):
+        """Save a response that carries an ETag or Last-Modified validator"""
+        if not (headers.get("ETag") or headers.get("Last-Modified")):
+            return
+        if "no-store" in (headers.get("Cache-Control") or "").lower():
+            return
+        meta_path, body_path = self._paths(url, user_agent)
+        entry = {
+            "url": url,
+            "status": status,
+            "headers": [(k, v) for k, v in headers.items() if k.lower() not in UNCACHED_HEADERS],
+        }
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            previous = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            _atomic_write(body_path, body)
+            _atomic_write(meta_path, json.dumps(entry).encode())
+        except OSError:
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(body) - previous
+            over = self._size > self.max_bytes
+        if over:
+            self._evict()
+
+    def _paths(self, url: str, user_agent: str) -> tuple:
+        key = hashlib.sha256(f"{user_agent}\n{url}".encode()).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".json", base + ".body"
+
+    def _entries(self) -> list:
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".body"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is at 90% of its cap"""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                for stale in (path, path[:-len(".body")] + ".json"):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+                total -= size
+            self._size = total
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class HttpClient:
+    """Keep-alive HTTP client with a per-host connection pool"""
+
+    def __init__(self, user_agent: str = None, timeout: float = None, max_per_host: int = None,
+                 cache: bool = None, max_bytes: int = None):
+        self.user_agent = user_agent or USER_AGENT
+        self.timeout = timeout or TIMEOUT
+        self.max_per_host = max_per_host or MAX_PER_HOST
+        self.max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+        self.cache = ResponseCache() if (CACHE_ENABLED if cache is None else cache) else None
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+        self._ssl_context = ssl.create_default_context()
+
+    def get(self, url: str, headers: dict = None, timeout: float = None,
+            max_bytes: int = None) -> Response:
+        """GET a URL, following redirects, and return the decoded response.
+
+        The body is capped at `max_bytes` (default: the client's max_bytes,
+        0 for no cap); `transferred` counts wire bytes across all hops.
+        """
+        start = time.time()
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        transferred = 0
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._cached_request(url, headers, timeout or self.timeout, max_bytes)
+            transferred += response.transferred
+            location = response.headers.get("Location")
+            if response.status in REDIRECT_STATUSES and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            response.elapsed = time.time() - start
+            response.transferred = transferred
+            return response
+        raise FetchError(f"Too many redirects for {url}")
+
+    def stream(self, url: str, headers: dict = None, timeout: float = None) -> StreamResponse:
+        """Open a URL, following redirects, for incremental reading (bypasses the cache)"""
+        start = time.time()
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._open(url, headers, timeout or self.timeout, start)
+            location = response.headers.get("Location")
+            if response.status in REDIRECT_STATUSES and location:
+                with response:
+                    response.read()
+                url = urllib.parse.urljoin(url, location)
+                continue
+            return response
+        raise FetchError(f"Too many redirects for {url}")
+
+    def close(self):
+        """Close all idle pooled connections"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _cached_request(self, url: str, headers: dict, timeout: float, max_bytes: int) -> Response:
+        """Issue one request, revalidating against the cache when possible"""
+        headers = dict(headers or {})
+        if self.cache is None:
+            return self._request(url, headers, timeout, max_bytes)
+
+        user_agent = headers.get("User-Agent", self.user_agent)
+        entry = self.cache.lookup(url, user_agent)
+        if entry:
+            for name, value in entry["headers"]:
+                if name.lower() == "etag":
+                    headers.setdefault("If-None-Match", value)
+                elif name.lower() == "last-modified":
+                    headers.setdefault("If-Modified-Since", value)
+
+        response = self._request(url, headers, timeout, max_bytes)
+        if response.status == 304 and entry:
+            try:
+                status, stored_headers, body = self.cache.load(entry, response.headers)
+            except OSError:
+                # Entry evicted by another process; refetch unconditionally
+                headers.pop("If-None-Match", None)
+                headers.pop("If-Modified-Since", None)
+                return self._request(url, headers, timeout, max_bytes)
+            truncated = bool(max_bytes) and len(body) > max_bytes
+            return Response(url, status, stored_headers, body[:max_bytes] if truncated else body,
+                            from_cache=True, transferred=response.transferred,
+                            truncated=truncated, declared_size=len(body))
+        if response.status == 200 and not response.truncated:
+            self.cache.store(url, user_agent, response.status, response.headers, response.body)
+        return response
+
+    def _request(self, url: str, headers: dict, timeout: float, max_bytes: int = None) -> Response:
+        with self._open(url, headers, timeout, time.time()) as stream_response:
+            body = stream_response.read(max_bytes)
+        return Response(url, stream_response.status, stream_response.headers, body,
+                        transferred=stream_response.bytes_read,
+                        truncated=stream_response.truncated,
+                        declared_size=stream_response.declared_size)
+
+    def _open(self, url: str, headers: dict, timeout: float, start: float) -> StreamResponse:
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise FetchError(f"Unsupported URL: {url}")
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+        path = urllib.parse.quote(parsed.path or "/", safe="/%:@!$&'()*+,;=-._~")
+        if parsed.query:
+            path += "?" + parsed.query
+
+        request_headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+        request_headers.update(headers or {})
+
+        slot = self._slot(key)
+        slot.acquire()
+        conn, reused = self._checkout(key, timeout)
+        try:
+            try:
+                resp = self._send(conn, path, request_headers, timeout)
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                conn = self._connect(key, timeout)
+                resp = self._send(conn, path, request_headers, timeout)
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            slot.release()
+            raise FetchError(f"{type(e).__name__}: {e} ({url})") from e
+
+        return StreamResponse(self, key, conn, resp, slot, url, start)
+
+    def _send(self, conn, path: str, headers: dict, timeout: float):
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        conn.request("GET", path, headers=headers)
+        return conn.getresponse()
+
+    def _slot(self, key: tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def _checkout(self, key: tuple, timeout: float) -> tuple:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(key, timeout), False
+
+    def _checkin(self, key: tuple, conn):
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def _connect(self, key: tuple, timeout: float):
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+
+def _decoder(content_encoding: str):
+    """Return an incremental decompressor for a gzip/deflate Content-Encoding, or None"""
+    if (content_encoding or "").strip().lower() in ("gzip", "x-gzip", "deflate"):
+        # wbits | 32 auto-detects the gzip or zlib header
+        return zlib.decompressobj(zlib.MAX_WBITS | 32)
+    return None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class DaemonExecutor:
+    """A minimal thread pool whose workers are daemon threads.
+
+    concurrent.futures joins its workers when the interpreter exits, so a
+    fetch stuck on a stalled server keeps the process alive long after a
+    deadline has passed. Work still running here is simply abandoned.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._queue = queue.SimpleQueue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._queue.put((future, fn, args, kwargs))
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return future
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+        if cancel_futures:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[0].cancel()
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+def get_client() -> HttpClient:
+    """Return the process-wide shared client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def configure(user_agent: str = None, timeout: float = None, max_per_host: int = None,
+              cache: bool = None, max_bytes: int = None) -> HttpClient:
+    """Replace the shared client with one using the given settings"""
+    global _client
+    with _client_lock:
+        old = _client
+        if cache is None and old:
+            cache = old.cache is not None
+        _client = HttpClient(
+            user_agent=user_agent or (old.user_agent if old else None),
+            timeout=timeout or (old.timeout if old else None),
+            max_per_host=max_per_host or (old.max_per_host if old else None),
+            cache=cache,
+            max_bytes=max_bytes if max_bytes is not None else (old.max_bytes if old else None),
+        )
+    if old:
+        old.close()
+    return _client
+
+
+def fetch(url: str, headers: dict = None, timeout: float = None, max_bytes: int = None) -> Response:
+    """GET a URL through the shared client"""
+    return get_client().get(url, headers=headers, timeout=timeout, max_bytes=max_bytes)
+
+
+def stream(url: str, headers: dict = None, timeout: float = None) -> StreamResponse:
+    """Open a URL through the shared client for incremental reading"""
+    return get_client().stream(url, headers=headers, timeout=timeout)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Topic clusters from keyword lists with MinHash and LSH banding
+
+Each keyword becomes a set of word tokens (lowercased, plural "s" dropped,
+stopwords removed). A MinHash signature per keyword is split into bands.
+Keywords sharing a band are candidates, so nothing is compared pairwise.
+Keywords are taken in volume order. Each joins the most similar cluster
+head among its candidates when their token Jaccard similarity reaches
+--threshold, or starts a new cluster with itself as head. The head is
+therefore the highest-volume keyword of its cluster.
+
+Input is a keyword_store dataset (.kwc), or the printed output of
+keyword_research.py, related_keywords.py, competitor_gap.py or
+autocomplete_ideas.py, or a plain list with one keyword per line.
+
+Usage: python3 scripts/keyword_clusters.py research.kwc --where "volume > 100"
+       python3 scripts/related_keywords.py "ai agent" --limit 1000 | python3 scripts/keyword_clusters.py -
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+from keyword_sets import normalize
+from keyword_store import KeywordDataset, parse_value
+
+BANDS = 20
+ROWS = 3  # Per band; 20 x 3 finds ~93% of pairs at Jaccard 0.5
+THRESHOLD = 0.5
+# Heads kept per bucket. Shingles shared by most keywords (the seed term) put
+# almost every head in a few buckets, which would make the run quadratic;
+# genuinely similar keywords still meet in their other bands.
+BUCKET_SIZE = 32
+MERSENNE = (1 << 61) - 1
+STOPWORDS = frozenset("a an and are at for from in is of on or the to vs with".split())
+
+TOON_HEADER = re.compile(r"^\w+\[[^\]]*\](?:\{([^}]*)\})?:\s*$")
+NUMBERED = re.compile(r"^\d+\.\s+(.+)$")
+
+
+def tokens(keyword: str) -> frozenset:
+    """Shingles of a keyword: its words and adjacent word pairs.
+
+    Plurals are folded and stopwords dropped first, so "best crm for agents"
+    gives {"best", "crm", "agent", "best crm", "crm agent"}. A keyword with
+    no word characters (punctuation, emoji) is its own single shingle.
+    """
+    words = re.findall(r"\w+", keyword.lower())
+    if not words:
+        return frozenset([normalize(keyword)])
+    folded = [word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+              for word in words]
+    words = [word for word in folded if word not in STOPWORDS] or folded
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+class MinHasher:
+    """MinHash signatures built from cached per-token hash vectors"""
+
+    def __init__(self, permutations: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.params = [(rng.randrange(1, MERSENNE), rng.randrange(MERSENNE)) for _ in range(permutations)]
+        self.vectors = {}
+
+    def vector(self, token: str) -> tuple:
+        vector = self.vectors.get(token)
+        if vector is None:
+            x = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            vector = self.vectors[token] = tuple((a * x + b) % MERSENNE for a, b in self.params)
+        return vector
+
+    def signature(self, token_set: frozenset) -> tuple:
+        # The element-wise minimum over the keyword's token vectors
+        cache = self.vectors
+        vectors = [cache[token] if token in cache else self.vector(token) for token in token_set]
+        return vectors[0] if len(vectors) == 1 else tuple(map(min, *vectors))
+
+
+def cluster(keywords: list, threshold: float = THRESHOLD, bands: int = BANDS, rows: int = ROWS) -> list:
+    """Cluster (keyword, volume) pairs into topics.
+
+    Returns clusters as {"head", "volume", "keywords": [(keyword, volume), ...]},
+    largest total volume first. Only cluster heads are stored in the LSH
+    buckets, at most BUCKET_SIZE each, so the work per keyword is bounded
+    by bands * BUCKET_SIZE whatever the input size.
+    """
+    merged = {}
+    for keyword, volume in keywords:
+        key = normalize(keyword)
+        if key and (key not in merged or volume > merged[key][1]):
+            merged[key] = (keyword, volume)
+    ordered = sorted(merged.values(), key=lambda kv: (-kv[1], kv[0]))
+
+    hasher = MinHasher(bands * rows)
+    buckets = [{} for _ in range(bands)]  # Per band: signature slice -> head ids
+    heads = []  # (shingles, shingle count, cluster)
+    clusters = []
+    for keyword, volume in ordered:
+        token_set = tokens(keyword)
+        signature = iter(hasher.signature(token_set))
+        keys = list(zip(*[signature] * rows))  # The signature cut into bands of `rows` values
+
+        candidates = set()
+        for bucket, key in zip(buckets, keys):
+            hits = bucket.get(key)
+            if hits:
+                candidates.update(hits)
+        best, best_score = None, threshold
+        size = len(token_set)
+        for head in candidates:
+            head_set, head_size, _ = heads[head]
+            # Jaccard can't exceed the ratio of the set sizes; skip the intersection if that's too low
+            if size < best_score * head_size or head_size < best_score * size:
+                continue
+            shared = len(token_set & head_set)
+            score = shared / (size + head_size - shared)
+            if score >= best_score and (best is None or score > best_score or head < best):
+                best, best_score = head, score
+        if best is None:
+            best = len(heads)
+            group = {"head": keyword, "volume": 0, "keywords": []}
+            heads.append((token_set, size, group))
+            clusters.append(group)
+            for bucket, key in zip(buckets, keys):
+                hits = bucket.setdefault(key, [])
+                if len(hits) < BUCKET_SIZE:
+                    hits.append(best)
+        group = heads[best][2]
+        group["volume"] += volume
+        group["keywords"].append((keyword, volume))
+
+    clusters.sort(key=lambda group: (-group["volume"], group["head"]))
+    return clusters
+
+
+def read_text(lines) -> list:
+    """(keyword, volume) pairs from script output tables, or one keyword per line.
+
+    If the text holds any table ("name[N]{columns}:"), only indented table
+    rows are read, so the surrounding key: value lines and tips are skipped.
+    """
+    lines = [line.rstrip("\n") for line in lines]
+    if not any(TOON_HEADER.match(line.strip()) for line in lines):
+        return [(line.strip(), 0) for line in lines if line.strip() and not line.startswith("#")]
+    keywords = []
+    columns = None
+    for line in lines:
+        header = TOON_HEADER.match(line.strip())
+        if header:
+            columns = (header.group(1) or "keyword").split(",")
+        elif not line[:1].isspace():
+            columns = None  # Any unindented line ends a table
+        elif columns is not None and line.strip():
+            text = line.strip()
+            numbered = NUMBERED.match(text)
+            if numbered and len(columns) == 1:
+                keywords.append((numbered.group(1), 0))
+                continue
+            fields = dict(zip(columns, text.split(",")))
+            keyword = fields.get("keyword")
+            if keyword and keyword != "N/A":
+                volume = parse_value(fields.get("volume", "0").lower())
+                keywords.append((keyword, volume if isinstance(volume, (int, float)) else 0))
+    return keywords
+
+
+def read_input(path: str, where: str = None) -> list:
+    """(keyword, volume) pairs from a .kwc dataset or a text file ("-" for stdin)"""
+    if path.endswith(".kwc"):
+        with KeywordDataset(path) as dataset:
+            return [(dataset.value("keyword", row), dataset.value("volume", row))
+                    for row in dataset.select(where)]
+    if where:
+        raise ValueError("--where needs a .kwc dataset")
+    if path == "-":
+        return read_text(sys.stdin)
+    with open(path) as f:
+        return read_text(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster keywords into topics with MinHash/LSH")
+    parser.add_argument("inputs", nargs="+",
+                        help=".kwc datasets, saved script output or keyword lists (- for stdin)")
+    parser.add_argument("--where", "-w", help="Filter for .kwc inputs, e.g. \"volume > 100\"")
+    parser.add_argument("--threshold", "-t", type=float, default=THRESHOLD,
+                        help=f"Token Jaccard similarity to join a cluster head (default: {THRESHOLD})")
+    parser.add_argument("--bands", type=int, default=BANDS, help=f"LSH bands (default: {BANDS})")
+    parser.add_argument("--rows", type=int, default=ROWS, help=f"MinHash rows per band (default: {ROWS})")
+    parser.add_argument("--min-size", type=int, default=2, help="Smallest cluster to show (default: 2)")
+    parser.add_argument("--limit", "-l", type=int, default=50, help="Clusters to show (default: 50)")
+    parser.add_argument("--members", type=int, default=5, help="Keywords shown per cluster (default: 5)")
+    parser.add_argument("--output", "-o", help="Write every cluster with all its keywords as JSONL")
+    args = parser.parse_args()
+
+    keywords = []
+    try:
+        for path in args.inputs:
+            keywords.extend(read_input(path, args.where))
+    except ValueError as e:
+        parser.error(str(e))
+    clusters = cluster(keywords, args.threshold, args.bands, args.rows)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            for group in clusters:
+                f.write(json.dumps({"head": group["head"], "volume": group["volume"],
+                                    "size": len(group["keywords"]),
+                                    "keywords": [keyword for keyword, _ in group["keywords"]]}) + "\n")
+
+    shown = [group for group in clusters if len(group["keywords"]) >= args.min_size]
+    print(f"keywords: {sum(len(group['keywords']) for group in clusters)}")
+    print(f"clusters: {len(clusters)}")
+    print(f"singletons: {sum(1 for group in clusters if len(group['keywords']) == 1)}")
+    if args.output:
+        print(f"output: {args.output}")
+    print()
+    if not shown:
+        print("No clusters found")
+        return
+    print(f"clusters[{min(len(shown), args.limit)} of {len(shown)}]{{head,size,total_volume,top_keywords}}:")
+    for group in shown[:args.limit]:
+        top = " | ".join(keyword for keyword, _ in group["keywords"][:args.members])
+        print(f"  {group['head']},{len(group['keywords'])},{group['volume']},{top}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@ Keyword research using DataForSEO API
 Usage: python3 scripts/keyword_research.py "seo tools" --limit 20
 """
 import argparse
-from dataforseo_api import api_post, get_result, print_keywords_list
+from dataforseo_api import api_post, get_result, print_keywords_list, run_cli
+from keyword_store import keyword_row, save_keywords
 
 
 def main():
@@ -13,6 +14,7 @@ def main():
     parser.add_argument("--location", "-loc", type=int, default=2840,
                         help="Location code (default: 2840 = US)")
     parser.add_argument("--limit", "-l", type=int, default=20, help="Max results")
+    parser.add_argument("--save", metavar="FILE", help="Add the results to a keyword_store dataset (.kwc)")
     args = parser.parse_args()
 
     data = [{
@@ -30,9 +32,15 @@ def main():
     
     if results:
         print_keywords_list(results[:args.limit])
+        if args.save:
+            rows = [keyword_row(kw["keyword"], kw.get("search_volume"), kw.get("keyword_difficulty"),
+                                kw.get("cpc"), args.location, f"keyword_research:{args.keyword}")
+                    for kw in results if kw.get("keyword")]
+            save_keywords(args.save, rows)
+            print(f"saved: {len(rows)} keywords to {args.save}")
     else:
         print("No results found")
 
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Local ranked-keyword sets and an N-way gap/overlap engine
+
+Each domain's ranked keywords are pulled once (paginated, highest volume
+first) and stored on disk as packed arrays: a 64-bit hash of the normalized
+keyword, its position, volume and difficulty, plus the keyword strings.
+
+All sets of one location/language share an append-only keyword universe
+that gives every hashed ID a dense index. Each stored set keeps its
+membership bitmap over that universe, one byte per keyword. Comparing any
+subset of domains then loads bitmaps into big ints and uses AND/OR/ANDNOT
+at C speed, instead of one billed domain_intersection call per pair.
+
+Usage:
+    from keyword_sets import load_sets, GapEngine
+    universe, sets = load_sets(["me.com", "a.com", "b.com"], location=2840)
+    engine = GapEngine(universe, sets)
+    engine.overlap_matrix()
+    engine.gaps("me.com", top=50)
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from itertools import compress
+from dataforseo_cache import ttl_for
+from dataforseo_export import EXPORTS, paginate, pluck
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+STORE_DIR = os.environ.get(
+    "SEO_GEO_KEYWORD_SETS",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                 "seo-geo", "keyword-sets"),
+)
+MAX_KEYWORDS = 100_000
+NO_DIFFICULTY = 255
+NO_POSITION = 0xFFFF
+FORMAT_VERSION = 1
+
+_universe_lock = threading.Lock()
+
+
+def normalize(keyword: str) -> str:
+    """Case- and whitespace-insensitive form used for keyword identity"""
+    return " ".join(keyword.lower().split())
+
+
+def keyword_id(keyword: str) -> int:
+    """64-bit hash of the normalized keyword"""
+    return int.from_bytes(hashlib.blake2b(normalize(keyword).encode(), digest_size=8).digest(), "little")
+
+
+def _store_name(*parts) -> str:
+    return "-".join(re.sub(r"[^A-Za-z0-9.-]+", "_", str(part).lower()) for part in parts)
+
+
+def _write_atomic(path: str, header: dict, columns: list, *blobs):
+    """Write a JSON header line, packed arrays, then raw byte blobs"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(json.dumps(header).encode() + b"\n")
+        for column in columns:
+            column.tofile(f)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+class KeywordUniverse:
+    """Append-only dense index of every keyword id seen for one location/language"""
+
+    def __init__(self, location: int, language: str = "en"):
+        self.location = location
+        self.language = language
+        self.path = os.path.join(STORE_DIR, f"{_store_name('universe', location, language)}.kwu")
+        self.token = uuid.uuid4().hex
+        self.ids = array("Q")
+        self.volumes = array("I")
+        # Dense indexes ordered by volume, highest first
+        self.by_volume = array("I")
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, location: int, language: str = "en") -> "KeywordUniverse":
+        universe = cls(location, language)
+        try:
+            with open(universe.path, "rb") as f:
+                header = json.loads(f.readline())
+                if header.get("version") != FORMAT_VERSION:
+                    return universe
+                universe.token = header["token"]
+                for column in (universe.ids, universe.volumes, universe.by_volume):
+                    column.fromfile(f, header["size"])
+        except (OSError, ValueError, EOFError):
+            return cls(location, language)
+        return universe
+
+    def save(self):
+        _write_atomic(self.path, {"version": FORMAT_VERSION, "token": self.token, "size": len(self)},
+                      [self.ids, self.volumes, self.by_volume])
+
+    def add(self, keyword_set: "KeywordSet"):
+        """Give every keyword of the set a dense index and record its bitmap and lookups"""
+        if self._index is None:
+            self._index = dict(zip(self.ids, range(len(self.ids))))
+        index = self._index
+        dense = array("I")
+        for kid, volume in zip(keyword_set.ids, keyword_set.volumes):
+            i = index.get(kid)
+            if i is None:
+                i = index[kid] = len(self.ids)
+                self.ids.append(kid)
+                self.volumes.append(volume)
+            else:
+                self.volumes[i] = volume  # The most recently indexed set has the freshest volume
+            dense.append(i)
+        keyword_set.index(self, dense)
+        self._changed = True
+
+    def __enter__(self):
+        """Reload under a lock so concurrent runs append to the latest universe"""
+        _universe_lock.acquire()
+        os.makedirs(STORE_DIR, exist_ok=True)
+        self._lockfile = open(f"{self.path}.lock", "w")
+        if fcntl:
+            fcntl.flock(self._lockfile, fcntl.LOCK_EX)
+        latest = KeywordUniverse.load(self.location, self.language)
+        self.token, self.ids, self.volumes, self.by_volume = (
+            latest.token, latest.ids, latest.volumes, latest.by_volume)
+        self._index = None
+        self._changed = False
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if exc[0] is None and self._changed:
+                self.by_volume = array("I", sorted(range(len(self.ids)), key=self.volumes.__getitem__,
+                                                   reverse=True))
+                self.save()
+        finally:
+            if fcntl:
+                fcntl.flock(self._lockfile, fcntl.LOCK_UN)
+            self._lockfile.close()
+            _universe_lock.release()
+
+
+class KeywordSet:
+    """One domain's ranked keywords as parallel packed arrays, highest volume first"""
+
+    def __init__(self, domain: str, location: int, language: str = "en", fetched: float = None):
+        self.domain = domain
+        self.location = location
+        self.language = language
+        self.fetched = fetched or time.time()
+        self.ids = array("Q")
+        self.positions = array("H")
+        self.volumes = array("I")
+        self.difficulties = array("B")
+        # Keyword text: a list while building, offsets into one UTF-8 blob once loaded
+        self._keywords = []
+        self._offsets = None
+        self._blob = b""
+        self._rows = {}
+        # Universe indexing: token, sorted dense indexes with their rows, bitmap bytes
+        self.universe = None
+        self.lookup_index = array("I")
+        self.lookup_rows = array("I")
+        self.bitmap = b""
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, keyword: str, position: int, volume: int, difficulty: int = None):
+        """Append a keyword; a repeated keyword keeps its best position"""
+        kid = keyword_id(keyword)
+        row = self._rows.get(kid)
+        position = min(position or NO_POSITION, NO_POSITION)
+        if row is not None:
+            self.positions[row] = min(self.positions[row], position)
+            return
+        self._rows[kid] = len(self.ids)
+        self.ids.append(kid)
+        self.positions.append(position)
+        self.volumes.append(min(volume or 0, 0xFFFFFFFF))
+        self.difficulties.append(NO_DIFFICULTY if difficulty is None else min(int(difficulty), 254))
+        self._keywords.append(keyword)
+
+    def finish(self):
+        """Sort rows by volume (descending) once all keywords are added"""
+        order = sorted(range(len(self.ids)), key=self.volumes.__getitem__, reverse=True)
+        for name in ("ids", "positions", "volumes", "difficulties"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, map(column.__getitem__, order)))
+        self._keywords = [self._keywords[i] for i in order]
+        self._rows = {}
+
+    def index(self, universe: KeywordUniverse, dense: array):
+        """Record this set's dense indexes (one per row) in the given universe"""
+        order = sorted(range(len(dense)), key=dense.__getitem__)
+        self.lookup_index = array("I", map(dense.__getitem__, order))
+        self.lookup_rows = array("I", order)
+        member = bytearray(max(dense) + 1 if dense else 0)
+        for i in dense:
+            member[i] = 1
+        self.bitmap = bytes(member)
+        self.universe = universe.token
+
+    def row_of(self, index: int) -> int:
+        """Row of a universe index in this set, or -1"""
+        at = bisect_left(self.lookup_index, index)
+        if at < len(self.lookup_index) and self.lookup_index[at] == index:
+            return self.lookup_rows[at]
+        return -1
+
+    def keyword(self, row: int) -> str:
+        if self._offsets is None:
+            return self._keywords[row]
+        return self._blob[self._offsets[row]:self._offsets[row + 1]].decode()
+
+    @staticmethod
+    def path_for(domain: str, location: int, language: str = "en") -> str:
+        return os.path.join(STORE_DIR, f"{_store_name(domain, location, language)}.kws")
+
+    def save(self, path: str = None):
+        """Write the header, packed columns, bitmap bytes, then the keyword blob"""
+        encoded = [self.keyword(row).encode() for row in range(len(self))]
+        offsets = array("I", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        header = {"version": FORMAT_VERSION, "domain": self.domain, "location": self.location,
+                  "language": self.language, "fetched": self.fetched, "count": len(self),
+                  "universe": self.universe, "bitmap": len(self.bitmap)}
+        _write_atomic(path or self.path_for(self.domain, self.location, self.language), header,
+                      [self.ids, self.positions, self.volumes, self.difficulties,
+                       self.lookup_index, self.lookup_rows, offsets],
+                      self.bitmap, b"".join(encoded))
+
+    @classmethod
+    def load(cls, path: str) -> "KeywordSet":
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported format version")
+            keyword_set = cls(header["domain"], header["location"], header["language"], header["fetched"])
+            count = header["count"]
+            keyword_set._offsets = array("I")
+            for column in (keyword_set.ids, keyword_set.positions, keyword_set.volumes,
+                           keyword_set.difficulties, keyword_set.lookup_index, keyword_set.lookup_rows):
+                column.fromfile(f, count)
+            keyword_set._offsets.fromfile(f, count + 1)
+            keyword_set.bitmap = f.read(header["bitmap"])
+            keyword_set._blob = f.read()
+        keyword_set.universe = header["universe"]
+        keyword_set._keywords = None
+        return keyword_set
+
+
+def fetch_set(domain: str, location: int, language: str = "en",
+              max_keywords: int = MAX_KEYWORDS) -> KeywordSet:
+    """Pull a domain's ranked keywords (highest volume first) into a KeywordSet"""
+    spec = EXPORTS["ranked_keywords"]
+    task = {**spec["task"], "target": domain, "location_code": location, "language_code": language}
+    keyword_set = KeywordSet(domain, location, language)
+    for items, _, _, _ in paginate(spec["endpoint"], task, spec["cursor"], max_rows=max_keywords):
+        for item in items:
+            keyword = pluck(item, ("keyword_data", "keyword"))
+            if keyword:
+                keyword_set.add(
+                    keyword,
+                    pluck(item, ("ranked_serp_element", "serp_item", "rank_group")),
+                    pluck(item, ("keyword_data", "keyword_info", "search_volume")),
+                    pluck(item, ("keyword_data", "keyword_properties", "keyword_difficulty")),
+                )
+    keyword_set.finish()
+    return keyword_set
+
+
+def load_sets(domains: list, location: int, language: str = "en", max_keywords: int = MAX_KEYWORDS,
+              refresh: bool = False, concurrency: int = 4, progress=None) -> tuple:
+    """Return (universe, sets) for the domains, fetching missing or stale sets concurrently.
+
+    Sets are reused for as long as the response cache keeps DataForSEO Labs
+    answers (see dataforseo_cache.ttl_for). New sets, and sets indexed
+    against a universe that has since been deleted, are indexed and saved.
+    """
+    max_age = ttl_for(EXPORTS["ranked_keywords"]["endpoint"])
+
+    def get(domain: str) -> KeywordSet:
+        if not refresh:
+            try:
+                keyword_set = KeywordSet.load(KeywordSet.path_for(domain, location, language))
+                if time.time() - keyword_set.fetched < max_age:
+                    return keyword_set
+            except (OSError, ValueError, EOFError):
+                pass
+        keyword_set = fetch_set(domain, location, language, max_keywords)
+        if progress:
+            progress(keyword_set)
+        return keyword_set
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        sets = list(executor.map(get, domains))
+
+    universe = KeywordUniverse.load(location, language)
+    if any(keyword_set.universe != universe.token for keyword_set in sets):
+        with universe:
+            for keyword_set in sets:
+                if keyword_set.universe != universe.token:
+                    universe.add(keyword_set)
+                    keyword_set.save()
+    if any(len(keyword_set.bitmap) > len(universe) for keyword_set in sets):
+        universe = KeywordUniverse.load(location, language)  # Grown by another process meanwhile
+    return universe, sets
+
+
+def _popcount(value: int) -> int:
+    return value.bit_count() if hasattr(value, "bit_count") else bin(value).count("1")
+
+
+class GapEngine:
+    """Overlap, unique and gap analysis across any number of indexed keyword sets.
+
+    Each domain is its stored membership bitmap (one 0/1 byte per universe
+    keyword) held in a big int, so AND/OR/ANDNOT run at C speed. Adding
+    bitmaps yields per-keyword competitor counts, and converting back to
+    bytes gives masks for itertools.compress.
+    """
+
+    def __init__(self, universe: KeywordUniverse, sets: list):
+        self.universe = universe
+        self.sets = sets
+        self.domains = [keyword_set.domain for keyword_set in sets]
+        self.size = len(universe)
+        self.bitmaps = [int.from_bytes(keyword_set.bitmap, "little") for keyword_set in sets]
+
+    def bit(self, domain: str) -> int:
+        return self.domains.index(domain)
+
+    def mask(self, bitmap: int) -> bytes:
+        """One 0/1 byte per universe keyword"""
+        return bitmap.to_bytes(self.size, "little")
+
+    def overlap_matrix(self) -> list:
+        """matrix[a][b] = keywords both domain a and domain b rank for (diagonal: set size)"""
+        n = len(self.sets)
+        matrix = [[0] * n for _ in range(n)]
+        for a in range(n):
+            matrix[a][a] = _popcount(self.bitmaps[a])
+            for b in range(a + 1, n):
+                matrix[a][b] = matrix[b][a] = _popcount(self.bitmaps[a] & self.bitmaps[b])
+        return matrix
+
+    def gap_matrix(self) -> list:
+        """matrix[a][b] = keywords domain b ranks for and domain a does not"""
+        overlap = self.overlap_matrix()
+        return [[overlap[b][b] - overlap[a][b] for b in range(len(overlap))]
+                for a in range(len(overlap))]
+
+    def unique(self) -> list:
+        """Per domain: keywords and total volume that no other domain ranks for"""
+        results = []
+        for d, keyword_set in enumerate(self.sets):
+            others = 0
+            for e, bitmap in enumerate(self.bitmaps):
+                if e != d:
+                    others |= bitmap
+            only = self.bitmaps[d] & ~others
+            results.append({"domain": keyword_set.domain, "keywords": _popcount(only),
+                            "volume": sum(compress(self.universe.volumes, self.mask(only)))})
+        return results
+
+    def gap_bitmap(self, domain: str, competitors: list = None, min_competitors: int = 1) -> tuple:
+        """(gap bitmap, competitor count bytes) for keywords at least
+        min_competitors competitors rank for and domain does not"""
+        if min_competitors < 1:
+            raise ValueError("min_competitors must be at least 1")
+        competitors = competitors or [d for d in self.domains if d != domain]
+        # Bytes are 0/1, so the sum counts competitors per keyword without carries
+        counts = self.mask(sum(self.bitmaps[self.bit(c)] for c in competitors))
+        table = bytes(1 if value >= min_competitors else 0 for value in range(256))
+        wanted = int.from_bytes(counts.translate(table), "little")
+        return wanted & ~self.bitmaps[self.bit(domain)], counts
+
+    def gaps(self, domain: str, competitors: list = None, min_competitors: int = 1,
+             top: int = 50) -> tuple:
+        """Keywords the competitors rank for and domain does not.
+
+        Ranked by search volume, then by the best competitor position.
+        Returns (total_gaps, rows) with the top rows only.
+        """
+        competitors = competitors or [d for d in self.domains if d != domain]
+        gap, counts = self.gap_bitmap(domain, competitors, min_competitors)
+        mask = self.mask(gap)
+        volumes = self.universe.volumes
+        members = [self.sets[self.bit(c)] for c in competitors]
+
+        # Walk the universe in volume order: take the first `top` gaps plus
+        # any that tie with the last one on volume, then order ties by position
+        found = []
+        for index in self.universe.by_volume:
+            if not mask[index]:
+                continue
+            if len(found) >= top and volumes[index] < volumes[found[-1][0]]:
+                break
+            best = (NO_POSITION + 1, None, -1)
+            for keyword_set in members:
+                row = keyword_set.row_of(index)
+                if row >= 0 and keyword_set.positions[row] < best[0]:
+                    best = (keyword_set.positions[row], keyword_set, row)
+            found.append((index, best))
+        found.sort(key=lambda entry: (-volumes[entry[0]], entry[1][0]))
+
+        results = []
+        for index, (position, keyword_set, row) in found[:top]:
+            difficulty = keyword_set.difficulties[row]
+            results.append({
+                "keyword": keyword_set.keyword(row),
+                "volume": volumes[index],
+                "difficulty": None if difficulty == NO_DIFFICULTY else difficulty,
+                "competitors": counts[index],
+                "best_position": None if position == NO_POSITION else position,
+                "best_competitor": keyword_set.domain,
+            })
+        return _popcount(gap), results
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Columnar, memory-mapped keyword datasets
+
+A .kwc file holds one row per keyword with the columns keyword, volume,
+difficulty, cpc, location and source. Numeric columns are contiguous typed
+arrays, each with a precomputed sort permutation. String columns are
+dictionary-encoded: a code per row plus one offset-indexed blob of distinct
+values. Opening a file maps it and casts memoryviews over its sections, so a
+million-keyword dataset opens in milliseconds. Queries use binary search
+over the sort permutations and C-level iterator pipelines (map/compress)
+instead of per-row Python code.
+
+Usage: python3 scripts/keyword_store.py research.kwc --where "volume > 1k and difficulty < 30" --top 50
+       python3 scripts/keyword_store.py research.kwc --info
+"""
+import argparse
+import json
+import mmap
+import operator
+import os
+import re
+import struct
+from array import array
+from functools import partial
+from itertools import compress, islice
+
+COLUMNS = ("keyword", "volume", "difficulty", "cpc", "location", "source")
+# Numeric column -> (array typecode, null sentinel); sentinels sort to one end
+NUMERIC = {
+    "volume": ("I", None),
+    "difficulty": ("B", 255),
+    "cpc": ("f", -1.0),
+    "location": ("I", None),
+}
+STRINGS = ("keyword", "source")
+FORMAT_VERSION = 1
+ALIGN = 8
+
+QUERY_CLAUSE = re.compile(
+    r"^\s*(\w+)\s*(>=|<=|!=|==|=|>|<|\bcontains\b)\s*(.+?)\s*$", re.IGNORECASE
+)
+SUFFIXES = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+# x OP value, written as a partial over the value: x < v  <=>  v > x
+FLIPPED = {"<": operator.gt, "<=": operator.ge, ">": operator.lt, ">=": operator.le,
+           "==": operator.eq, "!=": operator.ne}
+
+
+def parse_value(text: str):
+    """Quoted string, or a number with an optional k/m/b suffix"""
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    match = re.fullmatch(r"(-?\d+(?:\.\d+)?)([kmb]?)", text.strip().lower())
+    if not match:
+        return text
+    number = float(match.group(1)) * SUFFIXES.get(match.group(2), 1)
+    return int(number) if number.is_integer() else number
+
+
+def parse_query(query: str) -> list:
+    """'volume > 1k and difficulty < 30' -> [("volume", ">", 1000), ("difficulty", "<", 30)]"""
+    clauses = []
+    for part in re.split(r"\s+and\s+", query.strip(), flags=re.IGNORECASE):
+        match = QUERY_CLAUSE.match(part)
+        if not match:
+            raise ValueError(f"cannot parse condition: {part!r}")
+        column, op, text = match.group(1).lower(), match.group(2).lower(), match.group(3)
+        op = "==" if op == "=" else op
+        if column not in COLUMNS:
+            raise ValueError(f"unknown column: {column} (columns: {', '.join(COLUMNS)})")
+        # String columns take the raw text: "keyword contains 2024" means the string "2024"
+        value = parse_value(text)
+        if column in STRINGS and not isinstance(value, str):
+            value = text
+        if column in STRINGS and op not in ("==", "!=", "contains"):
+            raise ValueError(f"{column} supports ==, != and contains")
+        if column in NUMERIC and (op == "contains" or isinstance(value, str)):
+            raise ValueError(f"{column} needs a numeric comparison")
+        clauses.append((column, op, value))
+    return clauses
+
+
+def _null(value, sentinel):
+    return sentinel if value is None else value
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def keyword_row(keyword: str, volume=None, difficulty=None, cpc=None, location: int = 0,
+                source: str = "") -> tuple:
+    """A dataset row from API values; anything non-numeric ("N/A", None) becomes null"""
+    volume, difficulty, cpc = _number(volume), _number(difficulty), _number(cpc)
+    return (keyword, max(0, int(volume or 0)), None if difficulty is None else int(difficulty),
+            None if cpc is None else max(0.0, float(cpc)), int(location or 0), source)
+
+
+def write_dataset(path: str, rows):
+    """Write (keyword, volume, difficulty, cpc, location, source) tuples to a .kwc file"""
+    numeric = {name: array(typecode) for name, (typecode, _) in NUMERIC.items()}
+    codes = {name: array("I") for name in STRINGS}
+    interned = {name: {} for name in STRINGS}
+    for row in rows:
+        values = dict(zip(COLUMNS, row))
+        for name in STRINGS:
+            table = interned[name]
+            value = values[name] or ""
+            code = table.get(value)
+            if code is None:
+                code = table[value] = len(table)
+            codes[name].append(code)
+        for name, (typecode, sentinel) in NUMERIC.items():
+            value = _null(values[name], 0 if sentinel is None else sentinel)
+            if typecode == "B":
+                value = min(int(value), 254) if value != sentinel else sentinel
+            elif typecode == "I":
+                value = min(int(value), 0xFFFFFFFF)
+            numeric[name].append(value)
+
+    sections = []
+    for name, column in numeric.items():
+        sections.append((name, column))
+        sections.append((f"{name}.sorted", array("I", sorted(range(len(column)), key=column.__getitem__))))
+    for name in STRINGS:
+        encoded = [value.encode() for value in interned[name]]
+        offsets = array("Q", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        sections += [(f"{name}.codes", codes[name]), (f"{name}.offsets", offsets),
+                     (f"{name}.blob", b"".join(encoded))]
+
+    layout, position = {}, 0
+    for name, data in sections:
+        size = len(data) * data.itemsize if isinstance(data, array) else len(data)
+        kind = data.typecode if isinstance(data, array) else "bytes"
+        layout[name] = [position, size, kind]
+        position += size + (-size % ALIGN)
+    header = json.dumps({"version": FORMAT_VERSION, "rows": len(codes["keyword"]),
+                         "sections": layout}).encode()
+    header += b" " * (-(len(header) + 8) % ALIGN)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(struct.pack("<Q", len(header)) + header)
+        for name, data in sections:
+            raw = data.tobytes() if isinstance(data, array) else data
+            f.write(raw + b"\0" * (-len(raw) % ALIGN))
+    os.replace(tmp, path)
+
+
+class KeywordDataset:
+    """A memory-mapped .kwc file with column views and vectorized queries"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (size,) = struct.unpack_from("<Q", self._map)
+        header = json.loads(bytes(self._map[8:8 + size]))
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported format version")
+        self.rows = header["rows"]
+        self._base = memoryview(self._map)[8 + size:]
+        self._views = {}
+        for name, (offset, length, kind) in header["sections"].items():
+            view = self._base[offset:offset + length]
+            self._views[name] = view if kind == "bytes" else view.cast(kind)
+        self._strings = {name: {} for name in STRINGS}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        self._base.release()
+        self._map.close()
+        self._file.close()
+
+    def column(self, name: str) -> memoryview:
+        """Typed view of a numeric column, or the code view of a string column"""
+        return self._views[name if name in NUMERIC else f"{name}.codes"]
+
+    def string(self, name: str, code: int) -> str:
+        cache = self._strings[name]
+        if code not in cache:
+            offsets = self._views[f"{name}.offsets"]
+            cache[code] = bytes(self._views[f"{name}.blob"][offsets[code]:offsets[code + 1]]).decode()
+        return cache[code]
+
+    def strings(self, name: str) -> list:
+        """Distinct values of a string column, in code order"""
+        return [self.string(name, code) for code in range(len(self._views[f"{name}.offsets"]) - 1)]
+
+    def value(self, name: str, row: int):
+        if name in STRINGS:
+            return self.string(name, self._views[f"{name}.codes"][row])
+        value = self._views[name][row]
+        return None if value == NUMERIC[name][1] else value
+
+    def row(self, row: int) -> dict:
+        return {name: self.value(name, row) for name in COLUMNS}
+
+    def iter_rows(self):
+        """Every row as a tuple in COLUMNS order"""
+        for row in range(self.rows):
+            yield tuple(self.value(name, row) for name in COLUMNS)
+
+    # -- queries --------------------------------------------------------
+
+    def _search(self, name: str, value, right: bool) -> int:
+        """First position in the sort permutation whose value is >= (or > if right) value"""
+        column, order = self._views[name], self._views[f"{name}.sorted"]
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = column[order[mid]]
+            if current < value or (right and current == value):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _valid(self, name: str) -> tuple:
+        """Span of the sort permutation holding non-null values"""
+        sentinel = NUMERIC[name][1]
+        if sentinel is None:
+            return 0, self.rows
+        if sentinel < 0:
+            return self._search(name, sentinel, True), self.rows
+        return 0, self._search(name, sentinel, False)
+
+    def _span(self, name: str, op: str, value) -> tuple:
+        """Span of the sort permutation matching `name op value`, or None for !="""
+        if op == "!=":
+            return None
+        lo, hi = self._valid(name)
+        if op in (">", ">="):
+            lo = max(lo, self._search(name, value, op == ">"))
+        if op in ("<", "<="):
+            hi = min(hi, self._search(name, value, op == "<="))
+        if op == "==":
+            lo, hi = max(lo, self._search(name, value, False)), min(hi, self._search(name, value, True))
+        return lo, max(lo, hi)
+
+    def _codes(self, name: str, op: str, value: str) -> set:
+        """Dictionary codes of a string column matching == or contains"""
+        strings = self.strings(name)
+        if op == "contains":
+            value = value.lower()
+            return {code for code, string in enumerate(strings) if value in string.lower()}
+        return {code for code, string in enumerate(strings) if string == value}
+
+    def select(self, query: str = None) -> array:
+        """Row ids matching a query such as "volume > 1k and difficulty < 30"."""
+        clauses = parse_query(query) if query else []
+        if any(name == "cpc" for name, _, _ in clauses):
+            # Compare in float32, as the values are stored
+            clauses = [(name, op, struct.unpack("f", struct.pack("f", value))[0]) if name == "cpc"
+                       else (name, op, value) for name, op, value in clauses]
+
+        # The narrowest numeric range drives; the other clauses filter its rows
+        spans = [(self._span(name, op, value), i) for i, (name, op, value) in enumerate(clauses)
+                 if name in NUMERIC and op != "!="]
+        if spans:
+            (lo, hi), driver = min(spans, key=lambda span: span[0][1] - span[0][0])
+            name = clauses[driver][0]
+            rows = array("I", self._views[f"{name}.sorted"][lo:hi])
+            clauses = clauses[:driver] + clauses[driver + 1:]
+        else:
+            rows = array("I", range(self.rows))
+
+        for name, op, value in clauses:
+            column = self.column(name)
+            values = map(column.__getitem__, rows)
+            if name in STRINGS:
+                codes = self._codes(name, "==" if op == "!=" else op, value)
+                keep = map(codes.__contains__, values)
+                if op == "!=":
+                    keep = map(operator.not_, keep)
+            else:
+                keep = map(partial(FLIPPED[op], value), values)
+                sentinel = NUMERIC[name][1]
+                if sentinel is not None:
+                    keep = map(operator.and_, keep,
+                               map(partial(operator.ne, sentinel), map(column.__getitem__, rows)))
+            rows = array("I", compress(rows, keep))
+        return rows
+
+    def top(self, n: int, by: str = "volume", descending: bool = True, query: str = None) -> list:
+        """Row ids of the top n rows by a numeric column (nulls last), optionally filtered"""
+        order = self._views[f"{by}.sorted"]
+        lo, hi = self._valid(by)
+        ranked = order[lo:hi][::-1] if descending else order[lo:hi]
+        nulls = list(order[:lo]) + list(order[hi:])
+        if query is None:
+            return list(islice(ranked, n)) + nulls[:max(0, n - (hi - lo))]
+        rows = self.select(query)
+        if len(rows) * 8 < self.rows:
+            # Small selections: sort them directly
+            column = self._views[by]
+            valid = [row for row in rows if column[row] != NUMERIC[by][1]]
+            valid.sort(key=column.__getitem__, reverse=descending)
+            return (valid + [row for row in rows if column[row] == NUMERIC[by][1]])[:n]
+        wanted = set(rows)
+        found = list(islice(compress(ranked, map(wanted.__contains__, ranked)), n))
+        return found + [row for row in nulls if row in wanted][:n - len(found)]
+
+
+def save_keywords(path: str, rows: list):
+    """Add rows to a dataset file, creating it if needed.
+
+    Rows already in the file with the same (keyword, location, source) are
+    replaced, so re-running a research command refreshes its rows.
+    """
+    merged = {}
+    if os.path.exists(path):
+        with KeywordDataset(path) as dataset:
+            for row in dataset.iter_rows():
+                merged[(row[0].lower(), row[4], row[5])] = row
+    for row in rows:
+        merged[(row[0].lower(), row[4], row[5])] = tuple(row)
+    write_dataset(path, merged.values())
+
+
+def format_row(row: dict) -> str:
+    cpc = "N/A" if row["cpc"] is None else f"{row['cpc']:.2f}"
+    difficulty = "N/A" if row["difficulty"] is None else row["difficulty"]
+    return f"  {row['keyword']},{row['volume']},{difficulty},{cpc},{row['location']},{row['source']}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a columnar keyword dataset")
+    parser.add_argument("dataset", help=".kwc file written with --save by the keyword scripts")
+    parser.add_argument("--where", "-w",
+                        help='Filter, e.g. "volume > 1k and difficulty < 30 and keyword contains ai"')
+    parser.add_argument("--sort", "-s", default="volume", choices=sorted(NUMERIC),
+                        help="Sort column (default: volume)")
+    parser.add_argument("--asc", action="store_true", help="Sort ascending")
+    parser.add_argument("--top", "-n", type=int, default=50, help="Rows to show (default: 50)")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matches")
+    parser.add_argument("--info", action="store_true", help="Show row count and sources")
+    args = parser.parse_args()
+
+    with KeywordDataset(args.dataset) as dataset:
+        if args.info:
+            sources = dataset.strings("source")
+            print(f"dataset: {args.dataset}")
+            print(f"rows: {len(dataset)}")
+            print(f"sources[{len(sources)}]:")
+            for source in sources:
+                print(f"  {source}")
+            return
+        try:
+            if args.count:
+                print(f"matches: {len(dataset.select(args.where))}")
+                return
+            matches = len(dataset.select(args.where)) if args.where else len(dataset)
+            rows = dataset.top(args.top, args.sort, not args.asc, args.where)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"keywords[{len(rows)} of {matches}]{{{','.join(COLUMNS)}}}:")
+        for row in rows:
+            print(format_row(dataset.row(row)))
+
+
+if __name__ == "__main__":
+    main()
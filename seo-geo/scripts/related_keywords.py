@@ -3,21 +3,197 @@
 Related keywords from Google "searches related to" using DataForSEO API
 Get up to 4,680 keyword ideas from Google's related searches
 
+With several seeds or --expand, keywords found in one round become the seeds
+of the next (breadth-first). Keywords are deduplicated across seeds and
+rounds by their normalized form, so overlapping neighborhoods are never
+expanded twice. Only the top --limit by volume are kept in a heap.
+
 Usage: python3 scripts/related_keywords.py "AI agent" --depth 2 --limit 50
+       python3 scripts/related_keywords.py "AI agent" "LLM tools" --expand 3 --max-keywords 50000
+       python3 scripts/related_keywords.py "AI agent" --expand 2 --save research.kwc
 """
 import argparse
-from dataforseo_api import api_post, get_result, format_count
+import heapq
+import sys
+from dataforseo_api import api_post_batch, format_count, run_cli, task_error, task_result
+from keyword_sets import normalize
+from keyword_store import keyword_row, save_keywords
+
+ENDPOINT = "dataforseo_labs/google/related_keywords/live"
+MAX_PER_REQUEST = 1000  # API limit per task
+
+
+class TopK:
+    """Keeps the k highest-volume entries seen, in O(k) memory"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.heap = []
+        self.pushed = 0
+
+    def push(self, volume: int, entry: tuple):
+        # The push counter breaks volume ties in first-seen order
+        item = (volume, -self.pushed, entry)
+        self.pushed += 1
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+
+    def items(self) -> list:
+        """Entries, highest volume first"""
+        return [entry for _, _, entry in sorted(self.heap, reverse=True)]
+
+
+def parse_item(item: dict) -> tuple:
+    """(keyword, volume, difficulty, cpc) of a related_keywords item"""
+    kw_data = item.get("keyword_data") or {}
+    keyword = kw_data.get("keyword", item.get("keyword", ""))
+    info = kw_data.get("keyword_info") or {}
+    volume = info.get("search_volume", kw_data.get("search_volume", item.get("search_volume")))
+    properties = kw_data.get("keyword_properties") or {}
+    difficulty = properties.get("keyword_difficulty",
+                                kw_data.get("keyword_difficulty", item.get("keyword_difficulty", "N/A")))
+    cpc = info.get("cpc", kw_data.get("cpc", item.get("cpc")))
+    return keyword, volume if volume is not None else 0, difficulty, cpc
+
+
+def expand(seeds: list, location: int, depth: int = 1, rounds: int = 0, top: int = 50,
+           frontier: int = 20, per_request: int = MAX_PER_REQUEST, max_keywords: int = None,
+           max_cost: float = None, concurrency: int = 4, collect=None) -> dict:
+    """Breadth-first related-keyword expansion from one or more seeds.
+
+    Round 0 requests every seed; each later round requests the `frontier`
+    highest-volume keywords first found in the previous round. Requests in a
+    round run concurrently. Expansion stops after `rounds`, once
+    max_keywords unique keywords are known, or when the next request would
+    exceed max_cost (USD, from the cost DataForSEO reports per task).
+    `collect`, if given, is called with (keyword, volume, difficulty, cpc)
+    for every unique keyword, not just the top ones.
+
+    With max_cost, requests go out one at a time until a billed task gives
+    the price, then in chunks of at most `concurrency` that the remaining
+    budget covers at the average billed price. Tasks served from the
+    response cache cost nothing and don't count towards that average.
+    """
+    seen = set()
+    expanded = set()
+    best = TopK(top)
+    stats = {"requests": 0, "cached": 0, "billed": 0, "cost": 0.0, "rounds": 0, "errors": [],
+             "stopped": None}
+    current = list(dict.fromkeys(seeds))
+
+    def send(keywords: list) -> list:
+        tasks = api_post_batch(ENDPOINT, [{
+            "keyword": keyword,
+            "location_code": location,
+            "language_code": "en",
+            "depth": depth,
+            "limit": per_request,
+            "order_by": ["keyword_data.keyword_info.search_volume,desc"],
+        } for keyword in keywords], concurrency=concurrency)
+        for task in tasks:
+            stats["requests"] += 1
+            if task.get("from_cache"):
+                stats["cached"] += 1
+            elif task.get("cost") is not None:
+                stats["billed"] += 1
+                stats["cost"] += task["cost"]
+        return tasks
+
+    def affordable() -> int:
+        """Requests the remaining budget covers (1 while the price is unknown)"""
+        if not stats["billed"]:
+            return 1
+        price = stats["cost"] / stats["billed"]
+        return int((max_cost - stats["cost"]) / price) if price else concurrency
+
+    for hop in range(rounds + 1):
+        batch = []
+        for keyword in current:
+            key = normalize(keyword)
+            if key not in expanded:
+                expanded.add(key)
+                batch.append(keyword)
+        if not batch:
+            break
+
+        if max_cost is None:
+            tasks = send(batch)
+        else:
+            tasks = []
+            while len(tasks) < len(batch):
+                size = min(concurrency, affordable(), len(batch) - len(tasks))
+                if size <= 0:
+                    stats["stopped"] = "max_cost"
+                    break
+                tasks += send(batch[len(tasks):len(tasks) + size])
+            if not tasks:
+                break
+
+        next_frontier = TopK(frontier)
+        for keyword, task in zip(batch, tasks):
+            error = task_error(task)
+            if error:
+                stats["errors"].append((keyword, error))
+                continue
+            for result in task_result(task):
+                for item in result.get("items") or []:
+                    related, volume, difficulty, cpc = parse_item(item)
+                    key = normalize(related) if related else None
+                    if not key or key in seen:
+                        continue
+                    if max_keywords is not None and len(seen) >= max_keywords:
+                        stats["stopped"] = "max_keywords"
+                        break
+                    seen.add(key)
+                    best.push(volume, (related, volume, difficulty, hop))
+                    if collect:
+                        collect(related, volume, difficulty, cpc)
+                    if key not in expanded:
+                        next_frontier.push(volume, related)
+        stats["rounds"] = hop + 1
+        if stats["stopped"]:
+            break
+        current = next_frontier.items()
+
+    stats["total"] = len(seen)
+    stats["keywords"] = best.items()
+    return stats
+
+
+def read_keywords(path: str) -> list:
+    """Read keywords from a file (or stdin for "-"), one per line"""
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    finally:
+        if f is not sys.stdin:
+            f.close()
 
 
 def main():
     parser = argparse.ArgumentParser(description="Related keywords from Google")
-    parser.add_argument("keyword", help="Seed keyword")
+    parser.add_argument("keyword", nargs="*", help="Seed keyword(s)")
+    parser.add_argument("--keywords-file", "-f", help="File with one seed per line (- for stdin)")
     parser.add_argument("--location", "-loc", type=int, default=2840,
                         help="Location code (default: 2840 = US)")
     parser.add_argument("--depth", "-d", type=int, default=1,
                         help="Search depth 1-3 (default: 1, max keywords: depth^3 * 10)")
-    parser.add_argument("--limit", "-l", type=int, default=50, 
+    parser.add_argument("--limit", "-l", type=int, default=50,
                         help="Max results to display (default: 50)")
+    parser.add_argument("--expand", type=int, default=0, metavar="ROUNDS",
+                        help="Breadth-first rounds: re-seed from the best new keywords (default: 0)")
+    parser.add_argument("--frontier", type=int, default=20,
+                        help="Keywords expanded per round (default: 20)")
+    parser.add_argument("--per-request", type=int, default=MAX_PER_REQUEST,
+                        help=f"Keywords requested per seed, by volume (default: {MAX_PER_REQUEST})")
+    parser.add_argument("--max-keywords", type=int, help="Stop after this many unique keywords")
+    parser.add_argument("--max-cost", type=float, help="Stop before spending more than this (USD)")
+    parser.add_argument("--concurrency", "-c", type=int, default=4,
+                        help="Parallel requests per round (default: 4)")
+    parser.add_argument("--save", metavar="FILE",
+                        help="Add every keyword found to a keyword_store dataset (.kwc)")
     args = parser.parse_args()
 
     # Validate depth
@@ -25,60 +201,59 @@ def main():
         print("Error: depth must be between 1 and 3")
         return
 
-    data = [{
-        "keyword": args.keyword,
-        "location_code": args.location,
-        "language_code": "en",
-        "depth": args.depth,
-        "limit": 1000  # API limit, we'll filter in display
-    }]
-    
-    response = api_post("dataforseo_labs/google/related_keywords/live", data)
-    results = get_result(response)
-    
-    print(f"keyword: {args.keyword}")
+    seeds = list(args.keyword)
+    if args.keywords_file:
+        seeds.extend(read_keywords(args.keywords_file))
+    if not seeds:
+        parser.error("a keyword or --keywords-file is required")
+
+    found = []
+    source = f"related_keywords:{seeds[0]}" if len(seeds) == 1 else "related_keywords"
+
+    def collect(keyword, volume, difficulty, cpc):
+        found.append(keyword_row(keyword, volume, difficulty, cpc, args.location, source))
+
+    stats = expand(seeds, args.location, args.depth, args.expand, args.limit, args.frontier,
+                   min(args.per_request, MAX_PER_REQUEST), args.max_keywords, args.max_cost,
+                   args.concurrency, collect if args.save else None)
+    if args.save:
+        save_keywords(args.save, found)
+
+    print(f"keyword: {', '.join(seeds)}")
     print(f"location: {args.location}")
     print(f"depth: {args.depth}")
+    if args.expand or len(seeds) > 1:
+        print(f"rounds: {stats['rounds']}")
+        print(f"requests: {stats['requests']}")
+        if stats["cached"]:
+            print(f"cached: {stats['cached']}")
+        print(f"cost: ${stats['cost']:.4f}")
+        if stats["stopped"]:
+            print(f"stopped: {stats['stopped']}")
+    if args.save:
+        print(f"saved: {len(found)} keywords to {args.save}")
+    for seed, error in stats["errors"]:
+        print(f"error: {seed}: {error}", file=sys.stderr)
     print()
-    
-    if results:
-        keywords = []
-        for result in results:
-            items = result.get("items", [])
-            for item in items:
-                kw_data = item.get("keyword_data", {})
-                keyword = kw_data.get("keyword", item.get("keyword", ""))
-                volume = kw_data.get("search_volume", item.get("search_volume", 0))
-                difficulty = kw_data.get("keyword_difficulty", item.get("keyword_difficulty", "N/A"))
-                
-                if keyword:
-                    keywords.append({
-                        "keyword": keyword,
-                        "volume": volume if volume is not None else 0,
-                        "difficulty": difficulty
-                    })
-        
-        # Sort by volume desc
-        keywords.sort(key=lambda x: x["volume"], reverse=True)
-        
-        # Display limited results
-        display_keywords = keywords[:args.limit]
-        print(f"related_keywords[{len(display_keywords)} of {len(keywords)}]{{keyword,volume,difficulty}}:")
-        for kw in display_keywords:
-            keyword = kw["keyword"]
-            volume = format_count(kw["volume"])
-            difficulty = kw["difficulty"]
-            print(f"  {keyword},{volume},{difficulty}")
-        
-        if len(keywords) > args.limit:
-            print(f"\n... and {len(keywords) - args.limit} more keywords (use --limit to show more)")
+
+    keywords = stats["keywords"]
+    if keywords:
+        expanding = args.expand > 0
+        columns = "keyword,volume,difficulty,round" if expanding else "keyword,volume,difficulty"
+        print(f"related_keywords[{len(keywords)} of {stats['total']}]{{{columns}}}:")
+        for keyword, volume, difficulty, hop in keywords:
+            row = f"  {keyword},{format_count(volume)},{difficulty}"
+            print(f"{row},{hop}" if expanding else row)
+
+        if stats["total"] > args.limit:
+            print(f"\n... and {stats['total'] - args.limit} more keywords (use --limit to show more)")
     else:
         print("No related keywords found")
-    
+
     print()
     print("Tip: Higher depth finds more keywords but costs more API credits")
     print(f"  Depth 1: ~10 keywords, Depth 2: ~100, Depth 3: ~1,000+")
 
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
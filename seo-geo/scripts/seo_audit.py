@@ -2,68 +2,149 @@
 """
 SEO audit script (no API required)
 Usage: python3 scripts/seo_audit.py "https://example.com"
+       python3 scripts/seo_audit.py "https://example.com" --crawl --max-pages 500
 """
 import argparse
-import urllib.request
+import html as html_lib
+import json
 import urllib.parse
 import re
-import time
 import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from http_client import DaemonExecutor, configure, fetch, FetchError
+from sitemap import SitemapReader
 
 
-def fetch_url(url: str, timeout: int = 30) -> tuple:
+def fetch_url(url: str, timeout: float = None) -> tuple:
     """Fetch URL and return (content, headers, load_time)"""
     try:
-        start = time.time()
-        req = urllib.request.Request(url, headers={"User-Agent": "SEO-Audit/1.0"})
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            content = resp.read().decode("utf-8", errors="ignore")
-            headers = dict(resp.headers)
-            load_time = time.time() - start
-            return content, headers, load_time
-    except Exception as e:
+        response = fetch(url, timeout=timeout)
+    except FetchError:
         return None, None, None
+    if not response.ok:
+        return None, None, None
+    return response.text, dict(response.headers.items()), response.elapsed
+
+
+# Single tokenizer pass over the tags extract_meta cares about; comments,
+# scripts and styles are skipped as whole blocks
+TAG_RE = re.compile(r"<(?:(!--)|(/?)(title|meta|link|script|style|h1|head|body)\b([^>]*)>)", re.I)
+ATTR_RE = re.compile(r"""([a-zA-Z_:][-\w:.]*)\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+)""")
+CLOSE_RE = {name: re.compile(rf"</{name}\s*>", re.I) for name in ("title", "script", "style", "h1")}
+H1_RE = re.compile(r"<h1\b[^>]*>", re.I)
+INNER_TAG_RE = re.compile(r"<[^>]+>")
+JSONLD_RE = re.compile(r"<script[^>]+application/ld\+json", re.I)
+META_RE = re.compile(r"<meta\b([^>]*)>", re.I)
+
+
+def parse_attrs(attr_text: str) -> dict:
+    """Parse tag attributes into a lowercase-keyed dict"""
+    attrs = {}
+    for name, value in ATTR_RE.findall(attr_text):
+        if value[:1] in ("'", '"'):
+            value = value[1:-1]
+        attrs.setdefault(name.lower(), html_lib.unescape(value).strip())
+    return attrs
 
 
 def extract_meta(html: str) -> dict:
-    """Extract meta tags from HTML"""
-    result = {}
-    
-    # Title
-    title_match = re.search(r"<title[^>]*>([^<]+)</title>", html, re.I)
-    result["title"] = title_match.group(1).strip() if title_match else None
-    
-    # Meta description
-    desc_match = re.search(r'<meta[^>]+name=["\']description["\'][^>]+content=["\']([^"\']+)["\']', html, re.I)
-    if not desc_match:
-        desc_match = re.search(r'<meta[^>]+content=["\']([^"\']+)["\'][^>]+name=["\']description["\']', html, re.I)
-    result["description"] = desc_match.group(1).strip() if desc_match else None
-    
-    # OG tags
-    og_match = re.search(r'<meta[^>]+property=["\']og:title["\']', html, re.I)
-    result["og_tags"] = bool(og_match)
-    
-    # JSON-LD
-    jsonld_count = len(re.findall(r'application/ld\+json', html, re.I))
-    result["jsonld_count"] = jsonld_count
-    
-    # H1 (handle inline tags like <br>)
-    h1_match = re.search(r"<h1[^>]*>(.*?)</h1>", html, re.I | re.DOTALL)
-    if h1_match:
-        h1_text = re.sub(r"<[^>]+>", " ", h1_match.group(1))  # Remove inner tags
-        h1_text = re.sub(r"\s+", " ", h1_text).strip()  # Normalize whitespace
-        result["h1"] = h1_text[:100]
-    else:
-        result["h1"] = None
-    
+    """Extract meta tags from HTML in a single pass.
+
+    The head is tokenized tag by tag. Once it closes, the rest of the page
+    is only scanned with plain regexes instead of walking every tag: for the
+    first H1, the JSON-LD count, and meta tags placed after a missing or
+    early-closed head.
+    """
+    result = {
+        "title": None,
+        "description": None,
+        "og_tags": False,
+        "jsonld_count": 0,
+        "h1": None,
+        "canonical": None,
+        "robots": None,
+        "twitter": {},
+        "hreflang": [],
+    }
+    pos = 0
+    length = len(html)
+
+    while pos < length:
+        match = TAG_RE.search(html, pos)
+        if not match:
+            pos = length
+            break
+        pos = match.end()
+        if match.group(1):  # comment
+            close = html.find("-->", pos)
+            pos = length if close < 0 else close + 3
+            continue
+
+        closing, tag = match.group(2), match.group(3).lower()
+        if closing:
+            if tag == "head":
+                break
+        elif tag == "body":
+            break
+        elif tag == "meta":
+            _read_meta(result, parse_attrs(match.group(4)))
+        elif tag == "link":
+            attrs = parse_attrs(match.group(4))
+            rel = attrs.get("rel", "").lower().split()
+            if "canonical" in rel and result["canonical"] is None:
+                result["canonical"] = attrs.get("href")
+            elif "alternate" in rel and attrs.get("hreflang"):
+                result["hreflang"].append({"lang": attrs["hreflang"], "href": attrs.get("href")})
+        elif tag in ("title", "script", "style", "h1"):
+            close = CLOSE_RE[tag].search(html, pos)
+            inner_end = close.start() if close else length
+            if tag == "title" and result["title"] is None:
+                title = html_lib.unescape(html[pos:inner_end]).strip()
+                result["title"] = title or None
+            elif tag == "script" and "application/ld+json" in match.group(4).lower():
+                result["jsonld_count"] += 1
+            elif tag == "h1" and result["h1"] is None:
+                result["h1"] = _h1_text(html[pos:inner_end])
+            pos = close.end() if close else length
+
+    if pos < length:
+        for match in META_RE.finditer(html, pos):
+            _read_meta(result, parse_attrs(match.group(1)))
+        result["jsonld_count"] += len(JSONLD_RE.findall(html, pos))
+        if result["h1"] is None:
+            match = H1_RE.search(html, pos)
+            if match:
+                close = CLOSE_RE["h1"].search(html, match.end())
+                result["h1"] = _h1_text(html[match.end():close.start() if close else length])
     return result
 
 
-def check_robots(url: str) -> dict:
+def _read_meta(result: dict, attrs: dict):
+    key = (attrs.get("name") or attrs.get("property") or "").lower()
+    content = attrs.get("content")
+    if key == "description" and result["description"] is None and content:
+        result["description"] = content
+    elif key == "og:title":
+        result["og_tags"] = True
+    elif key == "robots" and result["robots"] is None:
+        result["robots"] = content
+    elif key.startswith("twitter:") and content is not None:
+        result["twitter"].setdefault(key[len("twitter:"):], content)
+
+
+def _h1_text(inner: str) -> str:
+    h1_text = INNER_TAG_RE.sub(" ", inner)  # Remove inner tags
+    h1_text = " ".join(html_lib.unescape(h1_text).split())  # Normalize whitespace
+    return h1_text[:100]
+
+
+def check_robots(url: str, timeout: float = None) -> dict:
     """Check robots.txt"""
     parsed = urllib.parse.urlparse(url)
     robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-    content, _, _ = fetch_url(robots_url)
+    content, _, _ = fetch_url(robots_url, timeout)
     
     result = {"exists": False, "ai_bots": []}
     if content:
@@ -75,31 +156,215 @@ def check_robots(url: str) -> dict:
     return result
 
 
-def check_sitemap(url: str) -> bool:
-    """Check if sitemap.xml exists"""
+def check_sitemap(url: str, timeout: float = None) -> dict:
+    """Check sitemap.xml and count its URLs, following sitemap indexes.
+
+    Counting stops early (complete=False) once `timeout` seconds have passed.
+    """
     parsed = urllib.parse.urlparse(url)
     sitemap_url = f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"
-    content, _, _ = fetch_url(sitemap_url)
+    reader = SitemapReader(timeout=timeout)
+    start = time.monotonic()
+    url_count = 0
+    complete = True
+    for _ in reader.iter_urls(sitemap_url):
+        url_count += 1
+        if timeout and time.monotonic() - start > timeout:
+            complete = False
+            break
+    root_failed = any(e["sitemap"] == sitemap_url for e in reader.errors)
+    return {
+        "exists": bool(reader.sitemaps) and not root_failed,
+        "sitemaps": len(reader.sitemaps),
+        "url_count": url_count,
+        "complete": complete,
+    }
+
+
+def run_checks(url: str, deadline: float = 30) -> tuple:
+    """Fetch the page, robots.txt and sitemap.xml in parallel.
+
+    Returns ((content, headers, load_time), robots, sitemap). Checks
+    still running when `deadline` seconds have passed count as failed; they
+    run on daemon threads, so they don't keep the process alive either.
+    """
+    executor = DaemonExecutor(max_workers=3)
+    page = executor.submit(fetch_url, url, deadline)
+    robots = executor.submit(check_robots, url, deadline)
+    # Leave headroom so a huge sitemap reports a partial count, not a timeout
+    sitemap = executor.submit(check_sitemap, url, deadline * 0.9)
+    wait([page, robots, sitemap], timeout=deadline)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    def outcome(future, default):
+        if not future.done() or future.cancelled() or future.exception():
+            return default
+        return future.result()
+
+    return (
+        outcome(page, (None, None, None)),
+        outcome(robots, {"exists": False, "ai_bots": []}),
+        outcome(sitemap, {"exists": False, "sitemaps": 0, "url_count": 0, "complete": False}),
+    )
+
+
+def sitemap_urls(url: str, max_urls: int = None) -> list:
+    """Collect page URLs from sitemap.xml, following sitemap indexes"""
+    parsed = urllib.parse.urlparse(url)
+    urls = []
+    for record in SitemapReader().iter_urls(f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"):
+        urls.append(record["loc"])
+        if max_urls and len(urls) >= max_urls:
+            break
+    return urls
+
+
+def extract_links(html: str, base_url: str) -> list:
+    """Extract same-host links from HTML"""
+    host = urllib.parse.urlparse(base_url).netloc
+    links = []
+    for href in re.findall(r'<a[^>]+href=["\']([^"\'#]+)', html, re.I):
+        link = urllib.parse.urljoin(base_url, href.strip())
+        parsed = urllib.parse.urlparse(link)
+        if parsed.scheme in ("http", "https") and parsed.netloc == host:
+            links.append(parsed._replace(fragment="").geturl())
+    return links
+
+
+def audit_page(url: str) -> dict:
+    """Fetch one page and return its meta summary"""
+    content, _, load_time = fetch_url(url)
     if not content:
-        return False
-    # Check for common sitemap indicators
-    return "<urlset" in content.lower() or "<sitemapindex" in content.lower() or "<?xml" in content.lower()
+        return {"url": url, "error": "Could not fetch URL"}
+    result = {"url": url, "load_time": round(load_time, 3)}
+    result.update(extract_meta(content))
+    result["_html"] = content
+    return result
+
+
+def crawl_site(url: str, max_pages: int = 500, concurrency: int = 8,
+               follow_links: bool = False) -> list:
+    """Audit many pages of a site concurrently, seeded from sitemap.xml.
+
+    Requests go through the shared HTTP client, which reuses keep-alive
+    connections and caps in-flight requests per host at `concurrency`. When
+    `follow_links` is set (or the sitemap is empty), in-page links on the
+    same host are added to the crawl frontier until `max_pages` is reached.
+    """
+    configure(max_per_host=concurrency)
+    seeds = [url] + sitemap_urls(url, max_pages)
+    follow_links = follow_links or len(seeds) == 1
+
+    seen = set()
+    frontier = deque()
+    for seed in seeds:
+        if seed not in seen and len(seen) < max_pages:
+            seen.add(seed)
+            frontier.append(seed)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        running = set()
+        while frontier or running:
+            while frontier and len(running) < concurrency * 2:
+                running.add(executor.submit(audit_page, frontier.popleft()))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = future.result()
+                html = page.pop("_html", None)
+                results.append(page)
+                if follow_links and html:
+                    for link in extract_links(html, page["url"]):
+                        if link not in seen and len(seen) < max_pages:
+                            seen.add(link)
+                            frontier.append(link)
+    return results
+
+
+def summarize_crawl(pages: list) -> dict:
+    """Aggregate per-page meta results into site-level counts"""
+    ok = [p for p in pages if "error" not in p]
+    titles = Counter(p["title"] for p in ok if p.get("title"))
+    descriptions = Counter(p["description"] for p in ok if p.get("description"))
+    load_times = [p["load_time"] for p in ok]
+    return {
+        "pages_crawled": len(pages),
+        "pages_failed": len(pages) - len(ok),
+        "missing_title": sum(1 for p in ok if not p.get("title")),
+        "missing_description": sum(1 for p in ok if not p.get("description")),
+        "missing_h1": sum(1 for p in ok if not p.get("h1")),
+        "missing_og_tags": sum(1 for p in ok if not p.get("og_tags")),
+        "missing_canonical": sum(1 for p in ok if not p.get("canonical")),
+        "noindex": sum(1 for p in ok if "noindex" in (p.get("robots") or "").lower()),
+        "pages_with_json_ld": sum(1 for p in ok if p.get("jsonld_count")),
+        "duplicate_titles": sum(n for n in titles.values() if n > 1),
+        "duplicate_descriptions": sum(n for n in descriptions.values() if n > 1),
+        "slow_pages": sum(1 for t in load_times if t >= 3),
+        "avg_load_time": round(sum(load_times) / len(load_times), 3) if load_times else 0,
+    }
+
+
+def print_crawl(url: str, pages: list, summary: dict):
+    """Print crawl results"""
+    print(f"=== SEO Crawl: {url} ===")
+    print()
+    print("## Summary")
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+    print()
+    print(f"pages[{len(pages)}]{{url,title_length,description_length,h1,json_ld,load_time}}:")
+    for page in sorted(pages, key=lambda p: p["url"]):
+        if "error" in page:
+            print(f"  {page['url']},error,,,,")
+            continue
+        title_len = len(page["title"]) if page.get("title") else 0
+        desc_len = len(page["description"]) if page.get("description") else 0
+        h1 = "yes" if page.get("h1") else "MISSING"
+        print(f"  {page['url']},{title_len},{desc_len},{h1},{page['jsonld_count']},{page['load_time']:.2f}s")
+    print()
+    print("=== Crawl Complete ===")
 
 
 def main():
     parser = argparse.ArgumentParser(description="SEO audit")
     parser.add_argument("url", help="URL to audit")
+    parser.add_argument("--crawl", action="store_true",
+                        help="Audit every page listed in sitemap.xml instead of a single URL")
+    parser.add_argument("--follow-links", action="store_true",
+                        help="In crawl mode, also follow same-host links found on pages")
+    parser.add_argument("--max-pages", type=int, default=500,
+                        help="Max pages to audit in crawl mode (default: 500)")
+    parser.add_argument("--concurrency", "-c", type=int, default=8,
+                        help="Concurrent requests per host in crawl mode (default: 8)")
+    parser.add_argument("--json", action="store_true",
+                        help="Output crawl results as JSON")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the on-disk HTTP cache and refetch everything")
+    parser.add_argument("--timeout", "-t", type=float, default=30,
+                        help="Overall deadline in seconds for the page, robots.txt and sitemap checks (default: 30)")
     args = parser.parse_args()
     
+    if args.no_cache:
+        configure(cache=False)
+    
     url = args.url
     if not url.startswith("http"):
         url = f"https://{url}"
     
+    if args.crawl:
+        pages = crawl_site(url, args.max_pages, args.concurrency, args.follow_links)
+        summary = summarize_crawl(pages)
+        if args.json:
+            print(json.dumps({"url": url, "summary": summary, "pages": pages}, indent=2))
+        else:
+            print_crawl(url, pages, summary)
+        return
+    
     print(f"=== SEO Audit: {url} ===")
     print()
     
-    # Fetch page
-    content, headers, load_time = fetch_url(url)
+    # Fetch page, robots.txt and sitemap concurrently
+    (content, headers, load_time), robots, sitemap = run_checks(url, args.timeout)
     if not content:
         print("error: Could not fetch URL")
         sys.exit(1)
@@ -114,7 +379,14 @@ def main():
     print(f"description: {desc[:80] if desc else 'MISSING'}{'...' if desc and len(desc) > 80 else ''}")
     print(f"description_length: {len(desc) if desc else 0} chars")
     print(f"og_tags: {'yes' if meta['og_tags'] else 'no'}")
+    print(f"twitter_card: {meta['twitter'].get('card', 'no')}")
     print(f"h1: {meta['h1'] if meta['h1'] else 'MISSING'}")
+    print(f"canonical: {meta['canonical'] or 'MISSING'}")
+    print(f"robots_meta: {meta['robots'] or 'none'}")
+    if meta["hreflang"]:
+        print(f"hreflang: {', '.join(alt['lang'] for alt in meta['hreflang'])}")
+    else:
+        print("hreflang: none")
     print()
     
     # Schema
@@ -130,7 +402,6 @@ def main():
     
     # robots.txt
     print("## robots.txt")
-    robots = check_robots(url)
     print(f"exists: {'yes' if robots['exists'] else 'no'}")
     if robots["ai_bots"]:
         print(f"ai_bots_mentioned: {', '.join(robots['ai_bots'])}")
@@ -140,8 +411,10 @@ def main():
     
     # Sitemap
     print("## Sitemap")
-    has_sitemap = check_sitemap(url)
-    print(f"sitemap_xml: {'yes' if has_sitemap else 'no'}")
+    print(f"sitemap_xml: {'yes' if sitemap['exists'] else 'no'}")
+    if sitemap["exists"]:
+        print(f"sitemaps_read: {sitemap['sitemaps']}")
+        print(f"url_count: {sitemap['url_count']}{'' if sitemap['complete'] else '+ (partial)'}")
     print()
     
     print("=== Audit Complete ===")
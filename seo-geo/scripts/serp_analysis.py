@@ -2,40 +2,104 @@
 """
 SERP analysis using DataForSEO API
 Usage: python3 scripts/serp_analysis.py "best seo tools" --depth 20
+       python3 scripts/serp_analysis.py "seo tools" "rank tracker" "backlink checker"
+       python3 scripts/serp_analysis.py --keywords-file keywords.txt
+       python3 scripts/serp_analysis.py --keywords-file keywords.txt --queue --job serp-job.jsonl
 """
 import argparse
-from dataforseo_api import api_post, get_result, print_serp_list, format_count
+import sys
+from dataforseo_api import (api_post, api_post_batch, get_result, print_serp_list, format_count,
+                            run_cli, task_error, task_result)
+from dataforseo_queue import QueueJob
+
+
+def read_keywords(path: str) -> list:
+    """Read keywords from a file (or stdin for "-"), one per line"""
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def print_serp(keyword: str, location: int, results: list):
+    """Print the SERP summary for one keyword"""
+    print(f"keyword: {keyword}")
+    print(f"location: {location}")
+
+    if results:
+        result = results[0]
+        print(f"total_results: {format_count(result.get('se_results_count'))}")
+        items = result.get("items", [])
+        print_serp_list(items)
+    else:
+        print("No results found")
 
 
 def main():
     parser = argparse.ArgumentParser(description="SERP analysis")
-    parser.add_argument("keyword", help="Search keyword")
+    parser.add_argument("keyword", nargs="*", help="Search keyword(s)")
+    parser.add_argument("--keywords-file", "-f",
+                        help="File with one keyword per line (- for stdin)")
     parser.add_argument("--location", "-loc", type=int, default=2840,
                         help="Location code (default: 2840 = US)")
     parser.add_argument("--depth", "-d", type=int, default=20, help="Search depth")
+    parser.add_argument("--concurrency", "-c", type=int, default=4,
+                        help="Parallel requests for multiple keywords (default: 4)")
+    parser.add_argument("--queue", action="store_true",
+                        help="Use the cheaper standard queue (task_post/tasks_ready) instead of live")
+    parser.add_argument("--job", "-j",
+                        help="Queue mode: job file that lets an interrupted run resume")
     args = parser.parse_args()
 
+    keywords = list(args.keyword)
+    if args.keywords_file:
+        keywords.extend(read_keywords(args.keywords_file))
+    if not keywords:
+        parser.error("a keyword or --keywords-file is required")
+
     data = [{
-        "keyword": args.keyword,
+        "keyword": keyword,
         "location_code": args.location,
         "language_code": "en",
         "depth": args.depth
-    }]
-    
-    response = api_post("serp/google/organic/live/advanced", data)
-    results = get_result(response)
-    
-    print(f"keyword: {args.keyword}")
-    print(f"location: {args.location}")
-    
-    if results:
-        result = results[0]
-        print(f"total_results: {format_count(result.get('se_results_count'))}")
-        items = result.get("items", [])
-        print_serp_list(items)
-    else:
-        print("No results found")
+    } for keyword in keywords]
+
+    if args.queue:
+        job = QueueJob("serp/google/organic/live/advanced", args.job, concurrency=args.concurrency)
+        job.submit(data)
+        for failure in job.failed:
+            print(f"keyword: {failure['data']['keyword']}")
+            print(f"error: {failure['error']}")
+            print()
+        print(f"queued: {len(job.pending)} tasks, waiting for results...", file=sys.stderr)
+        for task_data, task in job.results():
+            error = task_error(task)
+            if error:
+                print(f"keyword: {task_data['keyword']}")
+                print(f"error: {error}")
+            else:
+                print_serp(task_data["keyword"], args.location, task_result(task))
+            print()
+        return
+
+    if len(data) == 1:
+        response = api_post("serp/google/organic/live/advanced", data)
+        print_serp(keywords[0], args.location, get_result(response))
+        return
+
+    tasks = api_post_batch("serp/google/organic/live/advanced", data, concurrency=args.concurrency)
+    for i, (keyword, task) in enumerate(zip(keywords, tasks)):
+        if i:
+            print()
+        error = task_error(task)
+        if error:
+            print(f"keyword: {keyword}")
+            print(f"error: {error}")
+        else:
+            print_serp(keyword, args.location, task_result(task))
 
 
 if __name__ == "__main__":
-    main()
+    run_cli(main)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Streaming sitemap reader (stdlib only)
+
+Parses sitemap.xml incrementally from the response stream, decompresses
+.xml.gz sitemaps on the fly and follows <sitemapindex> children
+concurrently. URL records are yielded as they are parsed, so memory stays
+flat however many sitemaps and URLs a site lists.
+
+Usage: python3 scripts/sitemap.py "https://example.com/sitemap.xml" --limit 20
+"""
+import argparse
+import queue
+import threading
+import zlib
+import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from http_client import DaemonExecutor, FetchError, stream
+
+GZIP_MAGIC = b"\x1f\x8b"
+MAX_DEPTH = 3
+QUEUE_SIZE = 1000
+
+
+def _local(tag: str) -> str:
+    """Strip the XML namespace from a tag"""
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _gunzip(chunks, piece_size: int = 65536):
+    """Decompress gzip chunks incrementally in bounded pieces; pass plain XML through"""
+    decoder = None
+    first = True
+    for chunk in chunks:
+        if first:
+            first = False
+            if chunk[:2] != GZIP_MAGIC:
+                yield chunk
+                yield from chunks
+                return
+            decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        data = chunk
+        while data:
+            piece = decoder.decompress(data, piece_size)
+            data = decoder.unconsumed_tail
+            if piece:
+                yield piece
+    if decoder:
+        tail = decoder.flush()
+        if tail:
+            yield tail
+
+
+def parse_sitemap(chunks) -> Iterator[tuple]:
+    """Parse sitemap XML from an iterable of byte chunks.
+
+    Yields (kind, loc, lastmod) where kind is "url" for <urlset> entries
+    and "sitemap" for <sitemapindex> children. Gzip input is detected by
+    its magic bytes and decompressed incrementally.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    for chunk in _gunzip(iter(chunks)):
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+            if _local(elem.tag) not in ("url", "sitemap"):
+                continue
+            loc = lastmod = None
+            for child in elem:
+                name = _local(child.tag)
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = (child.text or "").strip() or None
+            # Drop parsed entries so the tree never grows past one element
+            root.clear()
+            if loc:
+                yield _local(elem.tag), loc, lastmod
+    parser.close()
+
+
+class SitemapReader:
+    """Reads a sitemap or sitemap index, following children concurrently"""
+
+    def __init__(self, concurrency: int = 4, max_depth: int = MAX_DEPTH, timeout: float = None):
+        self.concurrency = concurrency
+        self.max_depth = max_depth
+        self.timeout = timeout
+        self.sitemaps = []
+        self.errors = []
+
+    def iter_urls(self, sitemap_url: str) -> Iterator[dict]:
+        """Yield {"loc", "lastmod", "sitemap"} records for every listed page URL"""
+        self.sitemaps = []
+        self.errors = []
+        records = queue.Queue(maxsize=QUEUE_SIZE)
+        stop = threading.Event()
+        lock = threading.Lock()
+        pending = [0]
+        seen = set()
+        # Daemon workers: a child sitemap stalled mid-read must not hold up exit
+        executor = DaemonExecutor(max_workers=self.concurrency)
+        done = object()
+
+        def emit(item) -> bool:
+            while not stop.is_set():
+                try:
+                    records.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def submit(url: str, depth: int):
+            with lock:
+                if url in seen:
+                    return
+                seen.add(url)
+                pending[0] += 1
+            executor.submit(read, url, depth)
+
+        def read(url: str, depth: int):
+            try:
+                with stream(url, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    with lock:
+                        self.sitemaps.append(url)
+                    for kind, loc, lastmod in parse_sitemap(response.iter_chunks()):
+                        if stop.is_set():
+                            return
+                        if kind == "sitemap":
+                            if depth < self.max_depth:
+                                submit(loc, depth + 1)
+                        elif not emit({"loc": loc, "lastmod": lastmod, "sitemap": url}):
+                            return
+            except (FetchError, ET.ParseError, zlib.error) as e:
+                with lock:
+                    self.errors.append({"sitemap": url, "error": str(e)})
+            finally:
+                with lock:
+                    pending[0] -= 1
+                    finished = pending[0] == 0
+                if finished:
+                    emit(done)
+
+        submit(sitemap_url, 0)
+        try:
+            while True:
+                item = records.get()
+                if item is done:
+                    return
+                yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream URLs from a sitemap or sitemap index")
+    parser.add_argument("url", help="Sitemap URL (sitemap.xml, sitemap index or .xml.gz)")
+    parser.add_argument("--limit", "-l", type=int, default=20,
+                        help="Max URLs to display (default: 20, 0 = count only)")
+    parser.add_argument("--concurrency", "-c", type=int, default=4,
+                        help="Child sitemaps fetched in parallel (default: 4)")
+    args = parser.parse_args()
+
+    reader = SitemapReader(concurrency=args.concurrency)
+    count = 0
+    shown = []
+    for record in reader.iter_urls(args.url):
+        count += 1
+        if len(shown) < args.limit:
+            shown.append(record)
+
+    print(f"sitemap: {args.url}")
+    print(f"sitemaps_read: {len(reader.sitemaps)}")
+    print(f"url_count: {count}")
+    if shown:
+        print(f"urls[{len(shown)} of {count}]{{loc,lastmod}}:")
+        for record in shown:
+            print(f"  {record['loc']},{record['lastmod'] or 'N/A'}")
+    for error in reader.errors:
+        print(f"error: {error['sitemap']} - {error['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import importlib.util
+import os
+import sys
+import unittest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts")
+sys.path.insert(0, SCRIPTS)
+
+from hedge_lexicon import get_lexicon  # noqa: E402
+
+
+def load_script(name: str):
+    """Import a hyphenated script such as check-hedge-density.py as a module"""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), os.path.join(SCRIPTS, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class ScanTest(unittest.TestCase):
+    def test_dotted_capital_i(self):
+        # "İ".lower() is two characters, which forces the IGNORECASE path
+        text = "İstanbul. İ think so"
+        lexicon = get_lexicon()
+        hits = lexicon.scan(text)
+        self.assertEqual([(start, end) for start, end, _ in hits], [(10, 17)])
+        self.assertEqual(lexicon.entries[hits[0][2]][0], "I think")
+
+    def test_stream_dotted_capital_i(self):
+        check = load_script("check-hedge-density")
+        results = check.analyze_hedge_stream(["İstanbul. İ think so, ", "maybe."])
+        self.assertEqual(results["hedge_count"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
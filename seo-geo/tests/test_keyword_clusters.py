@@ -0,0 +1,18 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+
+from keyword_clusters import cluster  # noqa: E402
+
+
+class ClusterTest(unittest.TestCase):
+    def test_keywords_without_words(self):
+        clusters = cluster([("???", 1), ("🚀🚀", 3), ("crm tools", 5), ("best crm tools", 4)])
+        self.assertEqual([group["head"] for group in clusters], ["crm tools", "🚀🚀", "???"])
+        self.assertEqual(clusters[0]["volume"], 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
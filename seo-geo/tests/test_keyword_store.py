@@ -0,0 +1,34 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+
+from keyword_store import KeywordDataset, keyword_row, write_dataset  # noqa: E402
+
+
+class SelectStringTest(unittest.TestCase):
+    def select(self, keywords: list, query: str) -> list:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "test.kwc")
+            write_dataset(path, [keyword_row(keyword, 10) for keyword in keywords])
+            with KeywordDataset(path) as dataset:
+                return [dataset.value("keyword", row) for row in dataset.select(query)]
+
+    def test_equal_after_overlapping_entries(self):
+        self.assertEqual(self.select(["a", "aa", "xa"], "keyword == aa"), ["aa"])
+
+    def test_contains_after_overlapping_entries(self):
+        self.assertEqual(self.select(["a", "aa", "xa"], "keyword contains aa"), ["aa"])
+        self.assertEqual(self.select(["xa", "aa"], "keyword contains aa"), ["aa"])
+
+    def test_contains_is_unicode_case_insensitive(self):
+        self.assertEqual(self.select(["Über uns", "uber"], "keyword contains über"), ["Über uns"])
+
+    def test_not_equal(self):
+        self.assertEqual(self.select(["a", "aa", "xa"], "keyword != aa"), ["a", "xa"])
+
+
+if __name__ == "__main__":
+    unittest.main()
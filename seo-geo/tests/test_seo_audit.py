@@ -0,0 +1,29 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "scripts"))
+
+from seo_audit import extract_meta  # noqa: E402
+
+
+class ExtractMetaTest(unittest.TestCase):
+    def test_meta_after_early_closed_head(self):
+        meta = extract_meta('<html><head><title>T</title></head><body>'
+                            '<meta name="description" content="late"><meta property="og:title" content="x">'
+                            '<h1>Hello</h1></body></html>')
+        self.assertEqual((meta["title"], meta["description"], meta["og_tags"], meta["h1"]),
+                         ("T", "late", True, "Hello"))
+
+    def test_meta_without_head(self):
+        meta = extract_meta('<title>T</title><body><meta content="d" name="description">')
+        self.assertEqual(meta["description"], "d")
+
+    def test_head_meta_wins(self):
+        meta = extract_meta('<head><meta name="description" content="early"></head>'
+                            '<body><meta name="description" content="late">')
+        self.assertEqual(meta["description"], "early")
+
+
+if __name__ == "__main__":
+    unittest.main()